@@ -0,0 +1,95 @@
+"""
+Compares validating records with a JSON Schema document through the
+jsonschema library and through the decent validator translated from it.
+
+    python benchmarks/jsonschema_translation.py --records 100000
+
+Run it with decent installed, for example with ``pip install -e .``. The
+jsonschema library is optional: without it only decent is measured.
+"""
+
+from __future__ import division, print_function
+
+import argparse
+from timeit import default_timer as timer
+
+from decent import Error, from_jsonschema, generate
+
+
+DOCUMENT = {
+    'type': 'object',
+    'properties': {
+        'id': { 'type': 'integer', 'minimum': 1 },
+        'name': { 'type': 'string', 'minLength': 1, 'maxLength': 100 },
+        'email': { 'type': 'string', 'maxLength': 254 },
+        'status': { 'enum': ['active', 'disabled', 'pending'] },
+        'owner': { '$ref': '#/definitions/person' },
+        'editors': { 'type': 'array', 'items': { '$ref': '#/definitions/person' }, 'maxItems': 10 },
+        'shape': { 'oneOf': [{ '$ref': '#/definitions/circle' }, { '$ref': '#/definitions/square' }] },
+    },
+    'required': ['id', 'name', 'status', 'owner'],
+    'additionalProperties': False,
+    'definitions': {
+        'person': {
+            'type': 'object',
+            'properties': {
+                'name': { 'type': 'string', 'minLength': 1 },
+                'age': { 'type': 'integer', 'minimum': 0, 'maximum': 150 },
+            },
+            'required': ['name'],
+        },
+        'circle': {
+            'type': 'object',
+            'properties': { 'kind': { 'const': 'circle' }, 'radius': { 'type': 'number', 'minimum': 0 } },
+            'required': ['kind', 'radius'],
+        },
+        'square': {
+            'type': 'object',
+            'properties': { 'kind': { 'const': 'square' }, 'side': { 'type': 'number', 'minimum': 0 } },
+            'required': ['kind', 'side'],
+        },
+    },
+}
+
+
+def throughput(is_valid, records):
+    begin = timer()
+    valid = sum(1 for record in records if is_valid(record))
+    return len(records) / (timer() - begin), valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--invalid-ratio', type=float, default=0.1)
+    args = parser.parse_args()
+
+    begin = timer()
+    validator = from_jsonschema(DOCUMENT)
+    print("Translated in {:.2f} ms".format((timer() - begin) * 1000))
+    records = list(generate(validator, args.records, invalid_ratio=args.invalid_ratio, seed=1))
+
+    def decent_is_valid(record):
+        try:
+            validator(record)
+            return True
+        except Error:
+            return False
+
+    results = [('decent', decent_is_valid)]
+    try:
+        import jsonschema
+    except ImportError:
+        print("jsonschema is not installed, skipping it")
+    else:
+        results.insert(0, ('jsonschema', jsonschema.Draft7Validator(DOCUMENT).is_valid))
+
+    baseline = None
+    for name, is_valid in results:
+        rate, valid = throughput(is_valid, records)
+        baseline = baseline or rate
+        print("{:>10}: {:10.0f} records/s  {:5.2f}x  ({} valid)".format(name, rate, rate / baseline, valid))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures validation throughput of one shared schema from 1 to N threads.
+
+    python benchmarks/thread_scaling.py --threads 8 --records 200000
+
+Run it with decent installed, for example with ``pip install -e .``. On a
+free-threaded build throughput should grow close to linearly with the
+number of threads. With the GIL it stays about flat.
+"""
+
+from __future__ import division, print_function
+
+import argparse
+import sys
+import threading
+from timeit import default_timer as timer
+
+from decent import All, Coerce, Default, Length, List, Lower, Range, Schema, Strip
+from decent.schema import Optional
+
+
+schema = Schema({
+    'id': Coerce(int),
+    'name': All(Strip(), Length(min=1, max=100)),
+    'email': All(Strip(), Lower()),
+    'scores': List(Range(min=0, max=100)),
+    Optional('tags'): List(All(Strip(), Lower())),
+    Optional('active'): Default(True),
+})
+
+
+def record(i):
+    return {
+        'id': str(i),
+        'name': " Name {} ".format(i),
+        'email': "User{}@Example.com".format(i),
+        'scores': [i % 101, (i * 7) % 101, (i * 13) % 101],
+        'tags': [" A ", "b"] if i % 2 else [],
+        'active': None,
+    }
+
+
+def work(records, barrier):
+    barrier.wait()
+    for data in records:
+        schema(data)
+
+
+def run(threads, records):
+    chunks = [records[i::threads] for i in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    workers = [threading.Thread(target=work, args=(chunk, barrier)) for chunk in chunks]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    begin = timer()
+    for worker in workers:
+        worker.join()
+    return len(records) / (timer() - begin)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print("Python {} ({})".format(sys.version.split()[0], "GIL" if gil else "free-threaded"))
+
+    records = [record(i) for i in range(args.records)]
+    baseline = None
+    threads = 1
+    while threads <= args.threads:
+        throughput = run(threads, records)
+        baseline = baseline or throughput
+        print("{:3d} threads: {:10.0f} records/s  {:5.2f}x".format(threads, throughput, throughput / baseline))
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
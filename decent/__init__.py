@@ -1,3 +1,6 @@
 from .schema import *
 from .error import *
 from .validators import *
+from .stream import *
+from .synthetic import *
+from .json_schema import *
@@ -0,0 +1,101 @@
+"""
+Validation of asynchronous streams for asyncio applications. Requires Python
+3.6 or later.
+"""
+
+import asyncio
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+import six
+
+from .error import Error, Invalid
+from .parallel import load_validator
+
+# Python 3.6 doesn't have get_running_loop().
+_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+def _validate(validator, item):
+    try:
+        return validator(item)
+    except Invalid as e:
+        return e
+    except Error as e:
+        return Invalid([e])
+
+
+_validators = {}
+
+def _validate_all(validator, items):
+    if isinstance(validator, six.string_types):
+        if validator not in _validators:
+            _validators[validator] = load_validator(validator)
+        validator = _validators[validator]
+    return [_validate(validator, item) for item in items]
+
+
+async def validate_stream(validator, items, max_inflight=256, chunk_size=32, executor=None):
+    """
+    Validates the items of the async iterable ``items`` with ``validator``
+    and yields the result, or the :class:`decent.error.Invalid` error, of
+    every item in order.
+
+    Items are validated in chunks of ``chunk_size``, and control is given
+    back to the event loop after each chunk. If an ``executor`` is given, the
+    chunks are validated in it with ``loop.run_in_executor()`` instead.
+
+    ``validator`` can also be a ``module:attribute`` path, which is imported
+    with :func:`decent.parallel.load_validator`. A process pool requires a
+    path, since schemas can't be pickled, and every worker imports the
+    validator once.
+
+    No more than ``max_inflight`` items are read ahead of the ones that have
+    been yielded, so a slow consumer slows down reading from ``items``.
+    """
+    if isinstance(executor, ProcessPoolExecutor) and not isinstance(validator, six.string_types):
+        raise TypeError("A process pool requires the validator as a module:attribute path.")
+
+    loop = _running_loop()
+    pending = collections.deque()
+    inflight = 0
+    chunk = []
+
+    local = validator
+    if isinstance(validator, six.string_types):
+        local = load_validator(validator)
+
+    try:
+        async for item in items:
+            if executor is None:
+                yield _validate(local, item)
+                inflight += 1
+                if inflight >= chunk_size:
+                    inflight = 0
+                    await asyncio.sleep(0)
+                continue
+
+            chunk.append(item)
+            if len(chunk) < chunk_size:
+                continue
+            pending.append(loop.run_in_executor(executor, _validate_all, validator, chunk))
+            inflight += len(chunk)
+            chunk = []
+
+            # Yield finished chunks, waiting for them if too many items are in flight.
+            while pending and (inflight >= max_inflight or pending[0].done()):
+                results = await pending.popleft()
+                inflight -= len(results)
+                for result in results:
+                    yield result
+
+        if chunk:
+            pending.append(loop.run_in_executor(executor, _validate_all, validator, chunk))
+        while pending:
+            for result in await pending.popleft():
+                yield result
+    finally:
+        # Cancel the chunks that are left when the stream is closed or fails,
+        # and retrieve the errors of the ones that already failed.
+        for future in pending:
+            if not future.cancel() and not future.cancelled():
+                future.exception()
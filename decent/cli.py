@@ -0,0 +1,59 @@
+"""
+Command-line interface for validating files in bulk. Run with
+``python -m decent``.
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import sys
+
+from .parallel import JSONL, CSV, validate_file
+
+
+def _open_output(path, mode):
+    if path is None:
+        return None
+    if path == '-':
+        return sys.stdout.buffer if 'b' in mode and hasattr(sys.stdout, 'buffer') else sys.stdout
+    return open(path, mode)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m decent', description="Decent data validation.")
+    commands = parser.add_subparsers(dest='command')
+
+    validate = commands.add_parser('validate', help="Validate a JSON Lines or CSV file.")
+    validate.add_argument('--schema', required=True,
+        help="The validator to use, as module:attribute.")
+    validate.add_argument('--input', required=True,
+        help="The file to validate.")
+    validate.add_argument('--format', choices=[JSONL, CSV], default=JSONL,
+        help="The format of the input file.")
+    validate.add_argument('--output',
+        help="Write valid results to this file ('-' for standard output).")
+    validate.add_argument('--rejects',
+        help="Write rejected records and their errors to this file.")
+    validate.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+        help="The number of worker processes.")
+    validate.add_argument('--parts', type=int,
+        help="The number of ranges to split the input into. Four per worker by default.")
+
+    args = parser.parse_args(argv)
+    if args.command != 'validate':
+        parser.print_help()
+        return 2
+
+    output = _open_output(args.output, 'wb')
+    rejects = _open_output(args.rejects, 'w')
+    try:
+        stats = validate_file(args.schema, args.input, output, rejects,
+            workers=args.workers, parts=args.parts, format=args.format)
+    finally:
+        for f in (output, rejects):
+            if f is not None and f not in (sys.stdout, getattr(sys.stdout, 'buffer', None)):
+                f.close()
+
+    print(stats.report(), file=sys.stderr)
+    return 1 if stats.rejected else 0
@@ -16,15 +16,44 @@ class Error(DecentError):
     The ``path`` is a list of keys to the field this error is for. This is
     usually automatically set by the :class:`decent.schema.Schema` and/or
     validator callable being used.
+
+    If ``params`` is given, the ``message`` is a template that is formatted
+    with them when it's read: a tuple of positional or a dictionary of named
+    arguments. The unformatted message is available as ``template``.
     """
 
-    def __init__(self, message, path=None):
-        self.message = message
+    def __init__(self, message, path=None, params=None):
+        self.template = message
+        self.params = params
         if path:
             self.path = path[:]
         else:
             self.path = []
 
+    @property
+    def message(self):
+        params = self.params
+        if params is None:
+            return self.template
+        if isinstance(params, dict):
+            return self.template.format(**params)
+        return self.template.format(*params)
+
+    @message.setter
+    def message(self, message):
+        self.template = message
+        self.params = None
+
+    def prefixed(self, path):
+        """
+        Returns a copy of this error with ``path`` prepended to its path. The
+        error itself is not changed, so it can be shared between threads.
+        """
+        error = self.__class__.__new__(self.__class__, *self.args)
+        error.__dict__.update(self.__dict__)
+        error.path = list(path) + self.path
+        return error
+
     def as_dict(self, join='.'):
         """
         Returns the error as a path to message dictionary. Paths are joined
@@ -61,6 +90,13 @@ class Invalid(Error):
     def append(self, error):
         self.errors.append(error)
 
+    def prefixed(self, path):
+        """
+        Returns a new collection with ``path`` prepended to the path of every
+        error.
+        """
+        return Invalid([e.prefixed(path) for e in self.errors])
+
     def as_dict(self, join='.'):
         """
         Returns all the errors in this collection as a path to message
@@ -0,0 +1,332 @@
+"""
+Translation of JSON Schema documents into schemas and validators.
+"""
+
+import six
+
+from .error import Error, SchemaError
+from .schema import Schema, Ref, Optional
+from .validators import All, Any, Eq, In, Length, List, Range, Tagged, Type
+
+
+_TYPES = {
+    'string': (six.text_type,),
+    'integer': six.integer_types,
+    'number': six.integer_types + (float,),
+    'boolean': (bool,),
+    'null': (type(None),),
+    'array': (list,),
+    'object': (dict,),
+}
+
+_KEYWORD_TYPES = frozenset(('integer', 'number', 'string', 'array', 'object'))
+
+# Keywords that don't affect validation.
+_ANNOTATIONS = frozenset((
+    '$schema', '$id', 'id', '$comment', 'title', 'description', 'default',
+    'examples', 'format', 'definitions', '$defs', 'readOnly', 'writeOnly',
+    'deprecated', 'discriminator',
+))
+
+_KEYWORDS = _ANNOTATIONS | frozenset((
+    'type', 'properties', 'required', 'additionalProperties', 'minimum',
+    'maximum', 'minLength', 'maxLength', 'minItems', 'maxItems', 'enum',
+    'const', 'items', 'anyOf', 'oneOf', 'allOf', '$ref',
+))
+
+
+def from_jsonschema(doc):
+    """
+    Translates the JSON Schema document ``doc``, parsed into a dictionary,
+    into a validator. Objects become :class:`decent.schema.Schema` instances
+    and the other keywords the matching built-in validators.
+
+    The supported keywords are ``type``, ``properties``, ``required``,
+    ``additionalProperties`` (``true`` or ``false``), ``minimum``,
+    ``maximum``, ``minLength``, ``maxLength``, ``minItems``, ``maxItems``,
+    ``enum``, ``const``, ``items`` (a single schema), ``anyOf``, ``allOf``,
+    ``oneOf`` and local ``$ref`` references. Annotations like ``title`` are
+    ignored, and a :class:`decent.error.SchemaError` is raised for other
+    keywords. Like in JSON Schema, keywords such as ``minimum`` or
+    ``properties`` only apply to values of their type, so
+    ``{"type": ["string", "null"], "maxLength": 5}`` accepts ``None``.
+
+    ``oneOf`` alternatives that set a property to a different constant, or
+    that are listed in an OpenAPI ``discriminator``, become a
+    :func:`decent.validators.Tagged` validator. Other ``oneOf`` keywords are
+    checked like ``anyOf``.
+
+    Every referenced definition is translated once and the validator is
+    shared by all references to it. Recursive definitions use a
+    :class:`decent.schema.Ref`.
+    """
+    return _Translator(doc).reference('#')
+
+
+def _chain(validators):
+    if len(validators) == 1:
+        return validators[0]
+    return All(*validators)
+
+def _either(validators):
+    if len(validators) == 1:
+        return validators[0]
+    return Any(*validators)
+
+def _applies(kinds, validator):
+    """
+    Returns a validator that runs ``validator`` on values of the given types,
+    and passes values of other types through.
+    """
+    def built(value):
+        if type(value) in kinds:
+            return validator(value)
+        return value
+    return built
+
+
+def _json_key(value):
+    """
+    Returns a key for a JSON value that tells booleans and numbers apart,
+    which are equal in Python but not in JSON Schema.
+    """
+    kind = type(value)
+    if kind is bool:
+        return 'boolean', value
+    if kind is float or kind in six.integer_types:
+        return 'number', value
+    if kind is list:
+        return 'array', tuple(_json_key(item) for item in value)
+    if kind is dict:
+        return 'object', frozenset((key, _json_key(item)) for key, item in value.items())
+    if isinstance(value, six.string_types):
+        return 'string', value
+    return kind, value
+
+def _plain(value):
+    # Strings and null are only equal to values of their own type.
+    return value is None or isinstance(value, six.string_types)
+
+def _enum(values, message="Not an allowed value"):
+    if all(_plain(value) for value in values):
+        return In(values)
+
+    keys = set(_json_key(value) for value in values)
+    def built(value):
+        try:
+            allowed = _json_key(value) in keys
+        except TypeError:
+            allowed = False
+        if not allowed:
+            raise Error(message)
+        return value
+    return built
+
+def _const(expected, message="Not equal to {!s}"):
+    if _plain(expected):
+        return Eq(expected)
+
+    key = _json_key(expected)
+    def built(value):
+        try:
+            equal = _json_key(value) == key
+        except TypeError:
+            equal = False
+        if not equal:
+            raise Error(message, params=(expected,))
+        return value
+    return built
+
+
+class _Translator(object):
+    def __init__(self, root):
+        self.root = root
+        self.built = {}
+        self.pending = {}
+
+    def reference(self, pointer):
+        try:
+            return self.built[pointer]
+        except KeyError:
+            pass
+        try:
+            return self.pending[pointer]
+        except KeyError:
+            pass
+
+        ref = self.pending[pointer] = Ref(pointer)
+        validator = self.translate(self.resolve(pointer))
+        ref.resolve(validator)
+        del self.pending[pointer]
+        self.built[pointer] = validator
+        return validator
+
+    def resolve(self, pointer):
+        if not pointer.startswith('#'):
+            raise SchemaError("Only local references are supported: {}".format(pointer))
+        doc = self.root
+        for part in pointer[1:].split('/')[1:]:
+            part = six.moves.urllib.parse.unquote(part).replace('~1', '/').replace('~0', '~')
+            try:
+                doc = doc[int(part) if isinstance(doc, list) else part]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise SchemaError("Unresolvable reference: {}".format(pointer))
+        return doc
+
+    def translate(self, doc):
+        if doc is True or doc == {}:
+            return All()
+        if doc is False:
+            return In([])
+        if not isinstance(doc, dict):
+            raise SchemaError("A JSON Schema must be an object or a boolean.")
+
+        unknown = set(doc) - _KEYWORDS
+        if unknown:
+            raise SchemaError("Unsupported JSON Schema keywords: {}".format(", ".join(sorted(unknown))))
+
+        steps = []
+        if '$ref' in doc:
+            steps.append(self.reference(doc['$ref']))
+
+        types = doc.get('type')
+        if isinstance(types, six.string_types):
+            types = [types]
+
+        # Keywords like minimum only apply to values of their type, and pass
+        # values of other types through.
+        keywords = self.keywords(doc)
+        if types is not None:
+            steps.append(self.typed(types, keywords))
+        else:
+            for group in ('number', 'string', 'array', 'object'):
+                if keywords[group]:
+                    steps.append(_applies(_TYPES[group], _chain(keywords[group])))
+
+        if 'enum' in doc:
+            steps.append(_enum(doc['enum']))
+        if 'const' in doc:
+            steps.append(_const(doc['const']))
+
+        if 'allOf' in doc:
+            steps.extend(self.translate(item) for item in doc['allOf'])
+        if 'anyOf' in doc:
+            steps.append(Any(*[self.translate(item) for item in doc['anyOf']]))
+        if 'oneOf' in doc:
+            steps.append(self.one_of(doc['oneOf'], doc.get('discriminator')))
+
+        if not steps:
+            return All()
+        return _chain(steps)
+
+    def keywords(self, doc):
+        """
+        Returns the validators for the keywords of the given schema that
+        only apply to one type, by type.
+        """
+        keywords = { 'number': [], 'string': [], 'array': [], 'object': [] }
+        if 'minimum' in doc or 'maximum' in doc:
+            keywords['number'].append(Range(min=doc.get('minimum'), max=doc.get('maximum')))
+        if 'minLength' in doc or 'maxLength' in doc:
+            keywords['string'].append(Length(min=doc.get('minLength'), max=doc.get('maxLength')))
+        if 'items' in doc:
+            if isinstance(doc['items'], list):
+                raise SchemaError("Only a single schema is supported for items.")
+            keywords['array'].append(List(self.translate(doc['items'])))
+        if 'minItems' in doc or 'maxItems' in doc:
+            keywords['array'].append(Length(min=doc.get('minItems'), max=doc.get('maxItems')))
+        if any(key in doc for key in ('properties', 'required', 'additionalProperties')):
+            keywords['object'].append(self.object(doc))
+        return keywords
+
+    def typed(self, types, keywords):
+        """
+        Returns a validator that checks the type of a value once, and then
+        runs the keywords of that type on values of the type, so that their
+        errors are reported.
+        """
+        kinds, groups = [], []
+        for name in types:
+            if name not in _TYPES:
+                raise SchemaError("Unknown JSON Schema type: {}".format(name))
+            kinds.extend(kind for kind in _TYPES[name] if kind not in kinds)
+            group = 'number' if name == 'integer' else name
+            if group in _KEYWORD_TYPES and keywords[group] and group not in groups:
+                groups.append(group)
+
+        steps = []
+        if groups != ['object'] or len(types) > 1:
+            # The schema of an object checks the type itself.
+            steps.append(_either([Type(kind) for kind in kinds]))
+        for group in groups:
+            # Values of the other types pass one of the type checks, which
+            # come first so that the keyword errors are the ones raised.
+            others = [Type(kind) for kind in kinds if kind not in _TYPES[group]]
+            steps.append(_either(others + [_chain(keywords[group])]))
+        return _chain(steps)
+
+    def object(self, doc):
+        properties = doc.get('properties', {})
+        required = set(doc.get('required', ()))
+        additional = doc.get('additionalProperties', True)
+        if additional not in (True, False):
+            raise SchemaError("Only true or false is supported for additionalProperties.")
+
+        fields = {}
+        for key, value in properties.items():
+            fields[key if key in required else Optional(key)] = self.translate(value)
+        for key in required - set(properties):
+            fields[key] = All()
+        return Schema(fields, extra_keys=Schema.ACCEPT if additional else Schema.REJECT)
+
+    def one_of(self, alternatives, discriminator=None):
+        validators = [self.translate(item) for item in alternatives]
+        tags = [self.constants(item) for item in alternatives]
+        common = set.intersection(*[set(constants) for constants in tags]) if tags else set()
+
+        if discriminator is not None:
+            key = discriminator['propertyName']
+            if 'mapping' in discriminator:
+                return Tagged(key, dict((tag, self.reference(pointer))
+                    for tag, pointer in discriminator['mapping'].items()))
+            if key not in common and all('$ref' in item for item in alternatives):
+                # Without a mapping, the tags are the names of the schemas.
+                return Tagged(key, dict((item['$ref'].rsplit('/', 1)[-1], validator)
+                    for item, validator in zip(alternatives, validators)))
+            common &= set([key])
+
+        # Use a property that every alternative sets to a different constant.
+        for key in sorted(common):
+            values = [constants[key] for constants in tags]
+            try:
+                unique = len(set(values)) == len(values)
+            except TypeError:
+                continue
+            if unique:
+                return Tagged(key, dict(zip(values, validators)))
+
+        return Any(*validators)
+
+    def constants(self, doc):
+        """
+        Returns the required properties of an object schema that have a
+        constant value.
+        """
+        while isinstance(doc, dict) and '$ref' in doc and 'properties' not in doc:
+            doc = self.resolve(doc['$ref'])
+        if not isinstance(doc, dict):
+            return {}
+
+        constants = {}
+        required = doc.get('required', ())
+        for key, value in doc.get('properties', {}).items():
+            if key not in required or not isinstance(value, dict):
+                continue
+            if 'const' in value:
+                constants[key] = value['const']
+            elif len(value.get('enum', ())) == 1:
+                constants[key] = value['enum'][0]
+        return constants
+
+
+__all__ = ('from_jsonschema',)
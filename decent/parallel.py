@@ -0,0 +1,289 @@
+"""
+Multi-process validation of large newline-delimited files.
+
+The input file is memory-mapped and split into byte ranges aligned to line
+boundaries. Every worker maps the file on its own and validates its range,
+so the parent never reads or pickles the records. Workers only send back
+their counts, reject reports and the size of their output.
+"""
+
+import csv
+import importlib
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+from timeit import default_timer as timer
+
+import six
+
+from .error import Error, Invalid
+
+
+JSONL = 'jsonl'
+CSV = 'csv'
+
+
+class Stats(object):
+    """
+    Counts and a latency histogram for a validation run. Stats from separate
+    workers can be combined with :meth:`merge`.
+    """
+
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.valid = 0
+        self.rejected = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.histogram = {}
+
+    @property
+    def records(self):
+        return self.valid + self.rejected
+
+    def add_latency(self, seconds):
+        nanoseconds = max(seconds * 1e9, 1.0)
+        bucket = int(math.log(nanoseconds, 2) * self.BUCKETS_PER_DOUBLING)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def merge(self, other):
+        self.valid += other.valid
+        self.rejected += other.rejected
+        self.bytes += other.bytes
+        for bucket, count in six.iteritems(other.histogram):
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound of the latency histogram bucket containing the
+        given percentile, in seconds.
+        """
+        total = sum(six.itervalues(self.histogram))
+        if not total:
+            return 0.0
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= total * percent / 100.0:
+                break
+        return 2 ** (float(bucket + 1) / self.BUCKETS_PER_DOUBLING) / 1e9
+
+    def report(self):
+        seconds = self.seconds or 1e-9
+        return "\n".join([
+            "records:   {} ({} valid, {} rejected)".format(self.records, self.valid, self.rejected),
+            "time:      {:.3f} s".format(self.seconds),
+            "records/s: {:.0f}".format(self.records / seconds),
+            "MB/s:      {:.2f}".format(self.bytes / seconds / 1e6),
+            "latency:   p50 {:.1f} us, p99 {:.1f} us".format(
+                self.percentile(50) * 1e6, self.percentile(99) * 1e6),
+        ])
+
+
+def _map(f):
+    if not os.fstat(f.fileno()).st_size:
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def split(path, parts, start=0):
+    """
+    Splits the file at ``path`` into at most ``parts`` byte ranges starting
+    from the ``start`` offset. Every range ends after a newline or at the end
+    of the file. Returns a list of ``(start, end)`` tuples.
+    """
+    with open(path, 'rb') as f:
+        data = _map(f)
+        size = len(data)
+        ranges = []
+        for i in range(1, parts + 1):
+            if i == parts:
+                end = size
+            else:
+                end = data.find(b'\n', max(start, start + (size - start) * i // parts)) + 1 or size
+            if end > start:
+                ranges.append((start, end))
+                start = end
+            if start >= size:
+                break
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return ranges
+
+
+def read_header(path):
+    """
+    Reads the CSV header line of the file at ``path``. Returns the column
+    names and the offset of the first row.
+    """
+    with open(path, 'rb') as f:
+        line = f.readline()
+    return next(csv.reader([line.decode('utf-8')]), []), len(line)
+
+
+def _parse(line, format, header):
+    text = line.decode('utf-8')
+    if format == CSV:
+        row = next(csv.reader([text]))
+        if len(row) != len(header):
+            raise ValueError("Expected {} columns, got {}".format(len(header), len(row)))
+        return dict(zip(header, row))
+    return json.loads(text)
+
+
+def _errors(error):
+    if isinstance(error, Invalid):
+        return error.as_dict()
+    return Invalid([error]).as_dict()
+
+
+def validate_range(validator, path, start, end, output=None, format=JSONL, header=None):
+    """
+    Validates the lines of the file at ``path`` between the byte offsets
+    ``start`` and ``end`` with the given validator. The file is read through a
+    memory map. Valid results are written as JSON Lines to the file at the
+    ``output`` path, if given.
+
+    The records are JSON Lines, or CSV rows with the given ``header`` column
+    names if ``format`` is :data:`CSV`. CSV values can't contain newlines.
+
+    Returns a ``(stats, rejects, lines, size)`` tuple: a :class:`Stats`
+    instance, the reject reports, the number of lines in the range and the
+    size of the output in bytes. Every reject report is a dictionary with the
+    ``line`` number within the range, the byte ``offset`` of the line in the
+    file, the ``record`` and the ``errors`` as given by
+    :meth:`decent.error.Error.as_dict`.
+    """
+    stats = Stats()
+    rejects = []
+    lines = 0
+    out = open(output, 'wb') if output else None
+
+    with open(path, 'rb') as f:
+        data = _map(f)
+        position = start
+        try:
+            while position < end:
+                newline = data.find(b'\n', position, end)
+                stop = end if newline == -1 else newline + 1
+                line = data[position:stop]
+                offset = position
+                position = stop
+                lines += 1
+                stats.bytes += len(line)
+                if not line.strip():
+                    continue
+
+                begin = timer()
+                result = errors = None
+                try:
+                    record = _parse(line, format, header)
+                except ValueError as e:
+                    record = line.decode('utf-8', 'replace').rstrip('\r\n')
+                    errors = { '': "Invalid record: {}".format(e) }
+                else:
+                    try:
+                        result = validator(record)
+                    except Error as e:
+                        errors = _errors(e)
+                stats.add_latency(timer() - begin)
+
+                if errors is None:
+                    stats.valid += 1
+                    if out is not None:
+                        out.write(json.dumps(result, default=str).encode('utf-8') + b'\n')
+                else:
+                    stats.rejected += 1
+                    rejects.append({ 'line': lines, 'offset': offset, 'record': record, 'errors': errors })
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            if out is not None:
+                out.close()
+
+    size = os.path.getsize(output) if output else 0
+    return stats, rejects, lines, size
+
+
+def load_validator(path):
+    """
+    Imports a validator from a ``module:attribute`` path. The attribute can be
+    a dotted path inside the module.
+    """
+    module_name, _, attribute = path.partition(':')
+    if not module_name or not attribute:
+        raise ValueError("Expected a path like module:attribute, got {!r}".format(path))
+    result = importlib.import_module(module_name)
+    for name in attribute.split('.'):
+        result = getattr(result, name)
+    return result
+
+
+_validators = {}
+
+def _validate_range(arguments):
+    validator, path, start, end, output, format, header = arguments
+    if validator not in _validators:
+        _validators[validator] = load_validator(validator)
+    return validate_range(_validators[validator], path, start, end, output, format, header)
+
+
+def validate_file(validator, path, output=None, rejects=None, workers=1, parts=None, format=JSONL):
+    """
+    Validates the newline-delimited file at ``path`` with the validator at the
+    ``module:attribute`` path ``validator``. The file is split with
+    :func:`split` into ``parts`` ranges (by default four per worker) that are
+    validated with :func:`validate_range` in a pool of ``workers`` processes.
+
+    Valid results are written in input order to the ``output`` file object,
+    which must accept bytes. Reject reports are written in input order to the
+    ``rejects`` file object as JSON Lines, with line numbers counted from the
+    start of the file. Returns the combined :class:`Stats`.
+    """
+    stats = Stats()
+    begin = timer()
+
+    header, start = None, 0
+    if format == CSV:
+        header, start = read_header(path)
+    ranges = split(path, parts or workers * 4, start)
+
+    directory = tempfile.mkdtemp(prefix='decent-') if output is not None else None
+    arguments = [
+        (validator, path, range_start, range_end,
+            os.path.join(directory, 'part{}'.format(i)) if directory else None, format, header)
+        for i, (range_start, range_end) in enumerate(ranges)]
+
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap(_validate_range, arguments)
+    else:
+        pool = None
+        results = six.moves.map(_validate_range, arguments)
+
+    try:
+        line = 1 if format == CSV else 0
+        for argument, (range_stats, range_rejects, lines, size) in six.moves.zip(arguments, results):
+            stats.merge(range_stats)
+            if rejects is not None:
+                for report in range_rejects:
+                    report['line'] += line
+                    rejects.write(json.dumps(report, default=str) + '\n')
+            if output is not None:
+                with open(argument[4], 'rb') as part:
+                    shutil.copyfileobj(part, output)
+            line += lines
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if directory is not None:
+            shutil.rmtree(directory)
+
+    stats.seconds = timer() - begin
+    return stats
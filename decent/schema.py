@@ -1,8 +1,18 @@
+import array
 import copy
+import re
+import weakref
+from timeit import default_timer as timer
 
 import six
 
 from .error import SchemaError, Error, Invalid
+from .validators import All, Any, Coerce, List, Maybe, Msg, Tagged, Type, _accepts, _factory, _TEXT_TYPES
+
+
+class _Failed(object):
+    def __repr__(self):
+        return 'FAILED'
 
 
 class Schema(object):
@@ -22,6 +32,24 @@ class Schema(object):
 
     The ``required_error`` argument specifies the error message used when a
     key is missing. :attr:`.REQUIRED_ERROR` is the default.
+
+    The ``output`` argument specifies a class to return results as instead of
+    dictionaries: a namedtuple or a :class:`Record` subclass with a field for
+    every key. Values are stored as returned by the validators, and missing
+    keys are ``None``. Pass :class:`Record` itself to use a record type
+    created with :meth:`as_record_type`.
+
+    The ``limits`` argument specifies a :class:`Limits` instance for the
+    size of the data, checked while it's copied before any validator runs.
+    :attr:`.LIMITS` is the default.
+
+    If ``adaptive`` is ``True``, :meth:`is_valid` learns which fields are
+    cheap to check and likely to fail, and checks those first.
+
+    If ``lazy`` is ``True``, the schema is built on first use instead of on
+    construction, and a :class:`decent.error.SchemaError` for invalid
+    validators is raised then. :attr:`.LAZY` is the default. Lazy schemas
+    can be built in advance with :func:`prebuild_all`.
     """
 
     ACCEPT = 'ACCEPT'
@@ -38,111 +66,1121 @@ class Schema(object):
     The default error message for an unknown rejected key.
     """
 
-    def __init__(self, schema, entire=None, extra_keys=IGNORE, required_error=None):
+    FAILED = _Failed()
+    """
+    Returned instead of a result when errors are passed to an ``on_error``
+    callable.
+    """
+
+    LAZY = False
+    """
+    Whether schemas are built on first use by default. Applications with many
+    schemas can set this to ``True`` to speed up imports.
+    """
+
+    LIMITS = None
+    """
+    The :class:`Limits` of schemas without ``limits`` of their own. Servers
+    that validate untrusted data can set this to protect all of their
+    schemas.
+    """
+
+    REORDER_INTERVAL = 1000
+    """
+    The number of :meth:`is_valid` calls between reordering the fields of an
+    adaptive schema.
+    """
+
+    def __init__(self, schema, entire=None, extra_keys=IGNORE, required_error=None, lazy=None, output=None, adaptive=False, limits=None):
         self.extra_keys = extra_keys
         self.entire = entire
         self.required_error = required_error or self.REQUIRED_ERROR
+        self.adaptive = adaptive
+        self.limits = limits
 
         if not isinstance(schema, dict):
             raise SchemaError("The provided schema must be a dictionary.")
         self.schema = schema
-        self.validator = self._build(schema)
+        self._validator = None
 
-    def __call__(self, data):
+        if output is Record:
+            output = self.as_record_type()
+        self.output = output
+
+        if lazy is None:
+            lazy = self.LAZY
+        if lazy:
+            _pending.add(self)
+        else:
+            self.build()
+
+    def __call__(self, data, on_error=None):
         """
         Validates the given ``data`` dictionary and returns transformed values.
 
         Will raise :class:`decent.error.Invalid` if any validation errors are
-        encountered.
+        encountered. If an ``on_error`` callable is given, it's called with
+        the path, message template and params of each error instead (see
+        :class:`decent.error.Error`), and :attr:`.FAILED` is returned.
+        """
+        validator = self._validator or self.build()
+        try:
+            data = self._copy_input(data)
+        except Error as e:
+            return self._reject(e, on_error)
+        return validator(data, on_error)
+
+    def validate_many(self, records, on_error=None):
+        """
+        Validates every dictionary in the ``records`` iterable and yields its
+        result, or :attr:`.FAILED` if it was invalid. The errors are passed to
+        the ``on_error`` callable, if given, with the index of the record
+        prepended to their paths. No :class:`decent.error.Invalid` is raised.
+        """
+        validator = self._validator or self.build()
+        prefixed = _Prefixed(on_error or _ignore)
+        for i, record in enumerate(records):
+            prefixed.index = i
+            try:
+                record = self._copy_input(record)
+            except Error as e:
+                yield self._reject(e, prefixed)
+                continue
+            yield validator(record, prefixed)
+
+    def avalidate_stream(self, items, max_inflight=256, chunk_size=32, executor=None):
+        """
+        Returns an async generator that validates the dictionaries of the
+        async iterable ``items`` and yields the result or
+        :class:`decent.error.Invalid` of each in order, without blocking the
+        event loop. See :func:`decent.aio.validate_stream`, which also takes a
+        ``module:attribute`` path to the schema for process pools.
+        """
+        from .aio import validate_stream
+        return validate_stream(self, items, max_inflight, chunk_size, executor)
+
+    def validate_to_columns(self, records, types=None, numpy=False):
+        """
+        Validates every dictionary in the ``records`` iterable and writes the
+        values straight into a column per key, without building a result for
+        each record. Columns are preallocated if ``records`` has a length.
+
+        Columns are lists, or ``array.array`` buffers for keys with a typecode
+        in the ``types`` dictionary, like ``{ 'price': 'd' }``. Required keys
+        validated with a built-in :func:`decent.validators.Coerce` or
+        :func:`decent.validators.Type` of ``int`` or ``float`` (possibly last
+        in an :func:`decent.validators.All`) get a typecode by default. In
+        typed columns, ``None`` is stored as zero, or NaN for floats. If
+        ``numpy`` is ``True``, typed columns are returned as numpy arrays
+        sharing the memory of the buffers.
+
+        Returns a ``(columns, valid, rejects)`` tuple: a dictionary of columns
+        by key, a ``bytearray`` with a 1 for every valid record, and a list of
+        ``(index, error)`` tuples with a :class:`decent.error.Invalid` for
+        every invalid record. The columns hold ``None`` or zero for invalid
+        records. Extra keys are ignored, and schemas with an ``entire``
+        validator can't be used.
+        """
+        if self.entire is not None:
+            raise SchemaError("Column output doesn't support an entire validator.")
+
+        typecodes = {}
+        for key, validator in six.iteritems(self.schema):
+            typecode = _typecode(validator)
+            if typecode is not None and not isinstance(key, Optional):
+                typecodes[_field(key)] = typecode
+        typecodes.update(types or ())
+
+        size = len(records) if hasattr(records, '__len__') else None
+        columns = _Columns([_field(key) for key in self.schema], typecodes, size)
+        validator = self._build(self.schema, columns)
+
+        valid = bytearray(size or 0)
+        rejects = []
+        for i, record in enumerate(records):
+            columns.row = i
+            if size is None:
+                valid.append(0)
+            try:
+                validator(self._copy_input(record))
+            except Invalid as e:
+                rejects.append((i, Invalid(e.errors + columns.errors)))
+                columns.clear()
+            except Error as e:
+                rejects.append((i, Invalid([e])))
+                columns.clear()
+            else:
+                if columns.errors:
+                    rejects.append((i, Invalid(columns.errors)))
+                    columns.clear()
+                else:
+                    valid[i] = 1
+
+        result = dict(zip(columns._fields, columns.columns))
+        if numpy:
+            import numpy
+            for field, column in six.iteritems(result):
+                if isinstance(column, array.array):
+                    result[field] = numpy.frombuffer(column, column.typecode)
+        return result, valid, rejects
+
+    @property
+    def validator(self):
+        """
+        The validator function for this schema. Builds the schema if
+        necessary.
+        """
+        return self._validator or self.build()
+
+    def build(self):
+        """
+        Builds the schema if it hasn't been built yet, and returns its
+        validator function. Raises :class:`decent.error.SchemaError` if the
+        schema is invalid.
+        """
+        if self._validator is None:
+            self._fields = [
+                (_field(key), validator, key.default if isinstance(key, Marker) else None, not isinstance(key, Optional))
+                for key, validator in six.iteritems(self.schema)]
+            self._stats = _FieldStats(len(self._fields)) if self.adaptive else None
+            self._validator = self._build(self.schema, self.output)
+            _pending.discard(self)
+        return self._validator
+
+    def as_record_type(self, name='Record'):
+        """
+        Creates a :class:`Record` subclass called ``name`` with a slot for
+        every key in this schema. Keys must be strings that are valid
+        attribute names.
+        """
+        fields = []
+        for key in self.schema:
+            field = _field(key)
+            if not isinstance(field, six.string_types) or not _ATTRIBUTE.match(field) or hasattr(Record, field):
+                raise SchemaError("Key {!r} can't be used as a record field.".format(field))
+            fields.append(str(field))
+        fields.sort()
+        return type(str(name), (Record,), { '__slots__': tuple(fields), '_fields': tuple(fields) })
+
+    def is_valid(self, data):
+        """
+        Returns whether the given ``data`` is valid, stopping at the first
+        error. Missing keys are checked first, then the fields one by one.
+        The given data is not changed.
+
+        Adaptive schemas measure the cost and failure rate of every field,
+        and every :attr:`.REORDER_INTERVAL` calls reorder the fields to
+        minimize the expected cost of finding the first failure. This only
+        affects :meth:`is_valid`: validating with errors always reports them
+        in the same way.
+        """
+        validator = self._validator or self.build()
+        if not isinstance(data, dict):
+            return False
+
+        limits = self.limits if self.limits is not None else self.LIMITS
+        if limits is not None:
+            try:
+                _copy_limited(data, limits, copying=False)
+            except Error:
+                return False
+
+        fields = self._fields
+        for key, field_validator, default, required in fields:
+            if required and default is None and key not in data:
+                return False
+        if self.extra_keys == self.REJECT:
+            for key in data:
+                if key not in self.schema:
+                    return False
+
+        stats = self._stats
+        if stats is None:
+            order = range(len(fields))
+            timed = False
+        else:
+            order, timed = stats.start(self.REORDER_INTERVAL)
+
+        for i in order:
+            key, field_validator, default, required = fields[i]
+            if key in data:
+                value = data[key]
+            elif default is not None:
+                value = default
+            else:
+                continue
+
+            if timed:
+                begin = timer()
+            try:
+                field_validator(_copy(value))
+            except Error:
+                if stats is not None:
+                    stats.failures[i] += 1
+                    stats.calls[i] += 1
+                return False
+            if stats is not None:
+                stats.calls[i] += 1
+                if timed:
+                    stats.seconds[i] += timer() - begin
+                    stats.timed[i] += 1
+
+        # The entire validator needs the validated values.
+        if self.entire is not None:
+            try:
+                validator(_copy(data))
+            except Error:
+                return False
+        return True
+
+    @property
+    def check_order(self):
+        """
+        The keys in the order :meth:`is_valid` checks them.
+        """
+        self.build()
+        order = self._stats.order if self._stats is not None else range(len(self._fields))
+        return [self._fields[i][0] for i in order]
+
+    def accepts(self, kind):
+        """
+        Returns whether values of type ``kind`` can be valid for this schema.
+        Used by :func:`decent.validators.Any` to skip alternatives early.
         """
-        return self.validator(copy.deepcopy(data))
+        return issubclass(kind, dict)
 
-    def _build(self, schema):
+    def _build(self, schema, output=None):
         extra_keys = self.extra_keys
         entire = self.entire
 
         # Enumerate all the keys in the schema.
         all_keys = set(schema.keys())
-        _required_keys = set([key for key in all_keys if not isinstance(key, Optional)])
+        required_keys = frozenset([key for key in all_keys if not isinstance(key, Optional)])
 
         # Enumerate default key values.
-        defaults = {}
+        default_items = []
         for key in all_keys:
             if isinstance(key, Marker) and key.default != None:
-                defaults[key] = key.default
+                default_items.append((key, key.default))
 
         # Make sure all validators are callable.
         for key, value in six.iteritems(schema):
             if not hasattr(value, '__call__'):
                 raise SchemaError("Validator {!r} for key '{!s}' is not callable.".format(value, key))
+            if _lazy(value):
+                raise SchemaError("Validator for key '{!s}' returns a lazy list, which can't be part of a result.".format(key))
 
-        def validator(data):
+        # Find the position of every key in the output fields.
+        if output is not None:
+            fields = output._fields
+            positions = {}
+            for key in all_keys:
+                field = _field(key)
+                if field not in fields:
+                    raise SchemaError("Key '{!s}' is not a field of {}.".format(key, output.__name__))
+                positions[field] = fields.index(field)
+            if extra_keys == self.ACCEPT and not hasattr(output, '_extra'):
+                raise SchemaError("{} can't hold extra keys.".format(output.__name__))
+
+        # Find the nested validators the evaluator runs for recursive schemas.
+        deferred = frozenset()
+        if _recursive(schema):
+            deferred = frozenset(_field(key) for key, value in six.iteritems(schema) if _nested(value))
+
+        def prepare(data, on_error):
             # Sanity check.
             if not isinstance(data, dict):
+                if on_error is not None:
+                    on_error([], "Data must be a dictionary.", None)
+                    return False
                 raise Invalid([Error("Data must be a dictionary.")])
 
-            # Track which required keys are not present.
-            required_keys = _required_keys.copy()
-
             # Fill available defaults before validating.
-            missing = all_keys.copy() - set(data.keys())
-            for key in missing:
-                if key in defaults:
-                    data[key] = defaults[key]
+            for key, default in default_items:
+                if key not in data:
+                    data[key] = copy.deepcopy(default)
+            return True
+
+        def finish(data, present, result, errors, failed, on_error):
+            # Add an error for every missing key.
+            if present < len(required_keys):
+                for key in required_keys:
+                    if key not in data:
+                        failed = True
+                        self._report(self.required_error, key, errors, on_error)
+
+            if output is not None:
+                values, extra = result
+                result = output._make(values) if extra is None else output._make(values, extra)
+
+            # Run the validator for the entire schema.
+            if entire:
+                result = self._run_validator(entire, result, errors, None, on_error)
+                if result is self.FAILED:
+                    failed = True
+                    result = None
+
+            if failed:
+                if on_error is not None:
+                    return self.FAILED
+                raise Invalid(errors)
+            return result
+
+        def validator(data, on_error=None):
+            if not prepare(data, on_error):
+                return self.FAILED
+
+            # Count the required keys that are present.
+            present = 0
 
             errors = []
-            result = {}
+            failed = False
+            if output is None:
+                result = {}
+            else:
+                values = [None] * len(fields)
+                extra = None
 
             for key, value in six.iteritems(data):
                 # If this key is not in the schema, decide what to do with it.
                 if key not in all_keys:
                     if extra_keys == self.ACCEPT:
                         # Pass through as is.
-                        result[key] = value
+                        if output is None:
+                            result[key] = value
+                        else:
+                            if extra is None:
+                                extra = {}
+                            extra[key] = value
                     elif extra_keys == self.REJECT:
                         # Reject with error.
-                        errors.append(Error(self.REJECT_ERROR, [key]))
+                        failed = True
+                        self._report(self.REJECT_ERROR, key, errors, on_error)
                     continue # pragma: no cover
 
                 # Validate.
-                validator = schema[key]
-                result_value = self._run_validator(validator, value, errors, key)
-                if result_value:
+                result_value = self._run_validator(schema[key], value, errors, key, on_error)
+                if result_value is self.FAILED:
+                    failed = True
+                elif output is not None:
+                    values[positions[key]] = result_value
+                elif result_value:
                     result[key] = result_value
 
                 # Track required keys.
                 if key in required_keys:
-                    required_keys.remove(key)
+                    present += 1
 
-            # Add an error for every missing key.
-            for key in required_keys:
-                errors.append(Error(self.required_error, [key]))
+            return finish(data, present, result if output is None else (values, extra), errors, failed, on_error)
 
-            # Run the validator for the entire schema.
-            if entire:
-                result = self._run_validator(entire, result, errors)
+        if not deferred:
+            # Nested in a recursive schema, this runs as a single step.
+            def steps(data, on_error=None):
+                yield _RESULT, validator(data, on_error), None
+            validator.steps = steps
+            return validator
 
-            if errors:
-                raise Invalid(errors)
+        # Recursive schemas are evaluated with an explicit stack of steps,
+        # yielding the nested validators to the evaluator.
+        def steps(data, on_error=None):
+            if not prepare(data, on_error):
+                yield _RESULT, self.FAILED, None
+                return
 
-            return result
+            present = 0
+            errors = []
+            failed = False
+            if output is None:
+                result = {}
+            else:
+                values = [None] * len(fields)
+                extra = None
 
-        return validator
+            for key, value in six.iteritems(data):
+                if key not in all_keys:
+                    if extra_keys == self.ACCEPT:
+                        if output is None:
+                            result[key] = value
+                        else:
+                            if extra is None:
+                                extra = {}
+                            extra[key] = value
+                    elif extra_keys == self.REJECT:
+                        failed = True
+                        self._report(self.REJECT_ERROR, key, errors, on_error)
+                    continue # pragma: no cover
+
+                validator = schema[key]
+                if key in deferred:
+                    result_value = yield validator, value, key
+                else:
+                    result_value = self._run_validator(validator, value, errors, key, on_error)
+                if result_value is self.FAILED:
+                    failed = True
+                elif output is not None:
+                    values[positions[key]] = result_value
+                elif result_value:
+                    result[key] = result_value
+
+                if key in required_keys:
+                    present += 1
+
+            yield _RESULT, finish(data, present, result if output is None else (values, extra), errors, failed, on_error), None
 
-    def _run_validator(self, validator, data, errors, key=None):
+        def evaluate(data, on_error=None):
+            return _evaluate(steps, data, on_error, self.limits)
+        evaluate.steps = steps
+        return evaluate
+
+    def _run_validator(self, validator, data, errors, key=None, on_error=None):
         try:
             return validator(data)
         except Invalid as all:
             for e in all:
-                self._add_error(e, errors, key)
+                self._add_error(e, errors, key, on_error)
         except Error as e:
-            self._add_error(e, errors, key)
+            self._add_error(e, errors, key, on_error)
+        return self.FAILED
 
-    def _add_error(self, error, errors, key=None):
+    def _add_error(self, error, errors, key=None, on_error=None):
+        if on_error is not None:
+            on_error([key] + error.path if key else error.path, error.template, error.params)
+            return
         if key:
-            error.path.insert(0, key)
+            error = error.prefixed([key])
         errors.append(error)
 
+    def _copy_input(self, data):
+        limits = self.limits if self.limits is not None else self.LIMITS
+        if limits is None:
+            return _copy(data)
+        return _copy_limited(data, limits)
+
+    def _reject(self, error, on_error):
+        if on_error is None:
+            raise Invalid([error])
+        on_error(error.path, error.template, error.params)
+        return self.FAILED
+
+    def _report(self, message, key, errors, on_error):
+        if on_error is not None:
+            on_error([key], message, None)
+        else:
+            errors.append(Error(message, [key]))
+
+class Ref(object):
+    """
+    A placeholder validator for recursive schemas, which can't refer to
+    themselves while they're being defined. Use it in place of the schema
+    and :meth:`resolve` it to the schema afterwards::
+
+        node = Ref()
+        Node = node.resolve(Schema({
+            'value': Range(min=0),
+            Optional('children'): List(node),
+        }))
+
+    Schemas that contain references, directly or through nested schemas,
+    :func:`decent.validators.List` and combinators like
+    :func:`decent.validators.Maybe`, :func:`decent.validators.Any` or
+    :func:`decent.validators.Tagged`, are evaluated without recursion, so
+    data can be nested arbitrarily deep.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.target = None
+
+    def resolve(self, target):
+        """
+        Sets the validator this reference stands for, and returns it.
+        """
+        self.target = target
+        return target
+
+    def resolved(self):
+        """
+        Returns the validator this reference stands for. Raises
+        :class:`decent.error.SchemaError` if it hasn't been resolved.
+        """
+        if self.target is None:
+            raise SchemaError("Reference {} has not been resolved.".format(self.name or id(self)))
+        return self.target
+
+    def __call__(self, value):
+        return self.resolved()(value)
+
+    def __repr__(self):
+        return 'Ref({!r})'.format(self.name)
+
+_RESULT = object()
+
+# The key of frames that validate the same value as their parent, like the
+# alternatives of an Any, which add nothing to the error paths.
+_INLINE = object()
+
+def _children(validator):
+    """
+    Returns the validators a built-in combinator runs on the value, or on its
+    items for :func:`decent.validators.List`.
+    """
+    factory = _factory(validator)
+    if factory is All or factory is Any:
+        return validator.args['validators']
+    if factory is List or factory is Maybe or factory is Msg:
+        return (validator.args['validator'],)
+    if factory is Tagged:
+        default = validator.args['default']
+        children = list(dict(validator.args['validators']).values())
+        return children + [default] if default is not None else children
+    return ()
+
+def _nested(validator):
+    """
+    Returns whether the evaluator runs the given validator with steps of its
+    own instead of calling it.
+    """
+    if isinstance(validator, (Ref, Schema)):
+        return True
+    if _factory(validator) is List:
+        return not validator.args['lazy']
+    return any(_nested(child) for child in _children(validator))
+
+def _lazy(validator):
+    """
+    Returns whether the given validator runs a lazy
+    :func:`decent.validators.List`, directly or through combinators.
+    """
+    if _factory(validator) is List and validator.args['lazy']:
+        return True
+    return any(_lazy(child) for child in _children(validator))
+
+def _recursive(schema):
+    """
+    Returns whether a reference can be reached from the given schema
+    dictionary through nested schemas, lists and combinators.
+    """
+    seen = set()
+    pending = list(schema.values())
+    while pending:
+        validator = pending.pop()
+        if id(validator) in seen:
+            continue
+        seen.add(id(validator))
+        if isinstance(validator, Ref):
+            return True
+        if isinstance(validator, Schema):
+            pending.extend(validator.schema.values())
+        else:
+            pending.extend(_children(validator))
+    return False
+
+def _list_steps(validator, items):
+    failed = False
+    for i, item in enumerate(items):
+        result = yield validator, item, i
+        if result is Schema.FAILED:
+            failed = True
+        else:
+            items[i] = result
+    yield _RESULT, Schema.FAILED if failed else items, None
+
+def _all_steps(validators, value):
+    for validator in validators:
+        value = yield validator, value, _INLINE
+        if value is Schema.FAILED:
+            break
+    yield _RESULT, value, None
+
+def _any_steps(validators, value, buffer):
+    # Only the errors of the last alternative are kept in the buffer.
+    result = Schema.FAILED
+    for validator in validators:
+        del buffer[:]
+        result = yield validator, value, _INLINE
+        if result is not Schema.FAILED:
+            del buffer[:]
+            break
+    yield _RESULT, result, None
+
+class _StackErrors(object):
+    """
+    An ``on_error`` callable for the steps of a recursive schema that
+    prepends the keys of the frames on the stack to the error paths. Errors
+    are collected into ``invalid``, or passed on to ``on_error``.
+
+    Frames are ``(steps, key, message, buffer, limits)`` tuples. The
+    messages of :func:`decent.validators.Msg` frames replace the messages of
+    the errors within them, and :func:`decent.validators.Any` frames hold
+    the errors of their alternatives in a buffer until they have all failed.
+    """
+
+    __slots__ = ('stack', 'invalid', 'on_error')
+
+    def __init__(self, stack, invalid, on_error):
+        self.stack = stack
+        self.invalid = invalid
+        self.on_error = on_error
+
+    def __call__(self, path, template, params):
+        keys = [frame[1] for frame in self.stack[1:] if frame[1] is not _INLINE]
+        self.deliver(keys + path, template, params, len(self.stack))
+
+    def deliver(self, path, template, params, top):
+        """
+        Passes an error out through the frames below ``top``.
+        """
+        stack = self.stack
+        for i in range(top - 1, -1, -1):
+            steps, key, message, buffer, limits = stack[i]
+            if message is not None:
+                template, params = message, None
+            if buffer is not None:
+                buffer.append((path, template, params, i))
+                return
+        if self.on_error is not None:
+            self.on_error(path, template, params)
+        else:
+            self.invalid.append(Error(template, path, params))
+
+def _evaluate(steps, data, on_error=None, limits=None):
+    """
+    Validates ``data`` with the steps of a recursive schema. Nested schemas,
+    lists and combinators around them are run as frames on an explicit
+    stack instead of recursively, each with the key it's validating in its
+    parent. The ``limits`` the data has been checked against are not checked
+    again for nested schemas.
+    """
+    invalid = Invalid()
+    stack = []
+    errors = _StackErrors(stack, invalid, on_error)
+    stack.append((steps(data, errors), None, None, None, limits))
+
+    result = None
+    while stack:
+        frame = stack[-1]
+        kind, value, key = frame[0].send(result)
+        if kind is _RESULT:
+            stack.pop()
+            buffer = frame[3]
+            if buffer:
+                # Every alternative of an Any failed.
+                for path, template, params, top in buffer:
+                    errors.deliver(path, template, params, top)
+                del buffer[:]
+            result = value
+            continue
+        result = _push(stack, kind, value, key, errors)
+
+    if len(invalid):
+        raise invalid
+    return result
+
+def _push(stack, validator, value, key, errors):
+    """
+    Pushes a frame for running ``validator`` on ``value``, or runs it at once
+    and returns the result.
+    """
+    try:
+        # Unwrap references and the combinators that pick one validator.
+        while True:
+            if isinstance(validator, Ref):
+                validator = validator.resolved()
+                continue
+            factory = _factory(validator)
+            if factory is Maybe:
+                if value == None:
+                    return None
+                validator = validator.args['validator']
+            elif factory is Tagged:
+                validator = validator.select(value)
+            else:
+                break
+
+        if isinstance(validator, Schema):
+            # Data within checked data is within the same limits.
+            limits = validator.limits
+            if limits is not None and not any(frame[4] is limits for frame in stack):
+                _copy_limited(value, limits, copying=False)
+            stack.append((validator.validator.steps(value, errors), key, None, None, limits))
+            return None
+        if factory is List:
+            if (not validator.args['lazy'] and hasattr(value, '__iter__') and hasattr(value, '__setitem__')
+                    and not isinstance(value, _TEXT_TYPES)):
+                stack.append((_list_steps(validator.args['validator'], value), key, None, None, None))
+                return None
+        elif factory is All or factory is Any or factory is Msg:
+            if _nested(validator):
+                args = validator.args
+                if factory is All:
+                    stack.append((_all_steps(args['validators'], value), key, None, None, None))
+                elif factory is Msg:
+                    stack.append((_all_steps([args['validator']], value), key, args['message'], None, None))
+                else:
+                    alternatives = [v for v in args['validators'] if _accepts(v, type(value))]
+                    if args['validators'] and not _accepts(args['validators'][-1], type(value)):
+                        alternatives.append(args['validators'][-1])
+                    buffer = []
+                    stack.append((_any_steps(alternatives, value, buffer), key, None, buffer, None))
+                return None
+
+        return validator(value)
+    except Invalid as e:
+        for error in e:
+            errors(_prefix(key, error.path), error.template, error.params)
+    except Error as e:
+        errors(_prefix(key, e.path), e.template, e.params)
+    return Schema.FAILED
+
+def _prefix(key, path):
+    return path if key is _INLINE else [key] + path
+
+_ATOMIC = frozenset((type(None), bool, float, complex) + six.integer_types + six.string_types + (six.binary_type,))
+
+def _copy(data):
+    """
+    Returns a deep copy of ``data`` like ``copy.deepcopy``, but copies nested
+    dictionaries and lists without recursion. Other objects are copied with
+    ``copy.deepcopy``.
+    """
+    kind = type(data)
+    if kind in _ATOMIC:
+        return data
+    if kind is not dict and kind is not list:
+        return copy.deepcopy(data)
+
+    # The memo of copied objects is only needed once there is more than one.
+    memo = None
+    root = kind()
+    pending = [(data, root)]
+    while pending:
+        source, target = pending.pop()
+        items = six.iteritems(source) if type(source) is dict else enumerate(source)
+        for key, value in items:
+            kind = type(value)
+            if kind not in _ATOMIC:
+                if memo is None:
+                    memo = { id(data): root }
+                if id(value) in memo:
+                    value = memo[id(value)]
+                elif kind is dict or kind is list:
+                    memo[id(value)] = new = kind()
+                    pending.append((value, new))
+                    value = new
+                else:
+                    value = copy.deepcopy(value, memo)
+            if target.__class__ is dict:
+                target[key] = value
+            else:
+                target.append(value)
+    return root
+
+_STRINGS = frozenset(six.string_types + (six.text_type, six.binary_type, bytearray))
+
+# Containers that are checked by walking them, but copied with deepcopy once
+# they are within the limits.
+_SEQUENCES = (tuple, set, frozenset)
+
+def _copy_limited(data, limits, copying=True):
+    """
+    Returns a deep copy of ``data`` like :func:`_copy`, checking the given
+    :class:`Limits` on the way. Raises an :class:`decent.error.Error` with the
+    path of the first value that exceeds them. If ``copying`` is ``False``,
+    only checks the data.
+    """
+    max_depth, max_keys, max_items, max_length, max_nodes = (limits.max_depth,
+        limits.max_keys, limits.max_items, limits.max_length, limits.max_nodes)
+
+    kind = type(data)
+    if kind is not dict and kind is not list and not isinstance(data, _SEQUENCES):
+        if max_length is not None and kind in _STRINGS and len(data) > max_length:
+            raise Error(limits.LENGTH_ERROR, [], { 'max': max_length })
+        return _copy(data) if copying else data
+
+    if max_depth is not None and max_depth < 1:
+        raise Error(limits.DEPTH_ERROR, [], { 'max': max_depth })
+
+    nodes = 1
+    root = kind() if copying and (kind is dict or kind is list) else None
+    memo = { id(data): root } if root is not None else {}
+    # Tuples and sets are walked once, and copied after the walk.
+    walked = set([id(data)])
+    deferred = []
+    # Each pending container has its depth and its path as (parent path, key).
+    pending = [(data, root, 1, None)]
+    while pending:
+        source, target, depth, path = pending.pop()
+        if type(source) is dict:
+            if max_keys is not None and len(source) > max_keys:
+                raise Error(limits.KEYS_ERROR, _path(path), { 'max': max_keys })
+            items = six.iteritems(source)
+        else:
+            if max_items is not None and len(source) > max_items:
+                raise Error(limits.ITEMS_ERROR, _path(path), { 'max': max_items })
+            items = enumerate(source)
+
+        nodes += len(source)
+        if max_nodes is not None and nodes > max_nodes:
+            raise Error(limits.NODES_ERROR, [], { 'max': max_nodes })
+
+        for key, value in items:
+            kind = type(value)
+            if kind is dict or kind is list:
+                if id(value) in memo:
+                    value = memo[id(value)]
+                else:
+                    if max_depth is not None and depth >= max_depth:
+                        raise Error(limits.DEPTH_ERROR, _path((path, key)), { 'max': max_depth })
+                    memo[id(value)] = new = kind() if copying else None
+                    pending.append((value, new, depth + 1, (path, key)))
+                    value = new
+            elif isinstance(value, _SEQUENCES):
+                if id(value) not in walked:
+                    if max_depth is not None and depth >= max_depth:
+                        raise Error(limits.DEPTH_ERROR, _path((path, key)), { 'max': max_depth })
+                    walked.add(id(value))
+                    pending.append((value, None, depth + 1, (path, key)))
+                if target is not None:
+                    deferred.append((target, key if target.__class__ is dict else len(target), value))
+            else:
+                if max_length is not None and kind in _STRINGS and len(value) > max_length:
+                    raise Error(limits.LENGTH_ERROR, _path((path, key)), { 'max': max_length })
+                if copying and kind not in _ATOMIC:
+                    value = copy.deepcopy(value, memo)
+
+            if max_length is not None and type(key) in _STRINGS and len(key) > max_length:
+                raise Error(limits.LENGTH_ERROR, _path(path), { 'max': max_length })
+            if target is None:
+                continue
+            if target.__class__ is dict:
+                target[key] = value
+            else:
+                target.append(value)
+
+    if not copying:
+        return root
+    if root is None:
+        return copy.deepcopy(data, memo)
+    # The dictionaries and lists in the tuples and sets are copied already,
+    # and deepcopy() finds them in the memo.
+    for target, key, value in deferred:
+        target[key] = copy.deepcopy(value, memo)
+    return root
+
+def _path(path):
+    result = []
+    while path is not None:
+        path, key = path
+        result.append(key)
+    result.reverse()
+    return result
+
+class _FieldStats(object):
+    """
+    The number of checks, failures and the measured time of every field of an
+    adaptive schema. Only every ``SAMPLE``-th call is timed. Updates aren't
+    locked, since the statistics only need to be approximately right.
+    """
+
+    SAMPLE = 16
+
+    def __init__(self, count):
+        self.calls = [0] * count
+        self.failures = [0] * count
+        self.seconds = [0.0] * count
+        self.timed = [0] * count
+        self.order = tuple(range(count))
+        self.count = 0
+
+    def start(self, interval):
+        """
+        Counts a call and returns the order of the fields and whether to time
+        them.
+        """
+        self.count += 1
+        if self.count % interval == 0:
+            self.reorder()
+        return self.order, self.count % self.SAMPLE == 0
+
+    def reorder(self):
+        # Checking fields by increasing cost per failure probability
+        # minimizes the expected cost of finding the first failure.
+        def ratio(i):
+            cost = self.seconds[i] / self.timed[i] if self.timed[i] else 0.0
+            failure = (self.failures[i] + 1.0) / (self.calls[i] + 2.0)
+            return cost / failure
+        self.order = tuple(sorted(range(len(self.calls)), key=ratio))
+
+def _ignore(path, template, params):
+    pass
+
+class _Prefixed(object):
+    """
+    An ``on_error`` callable that prepends an index to the error paths.
+    """
+
+    __slots__ = ('index', 'on_error')
+
+    def __init__(self, on_error):
+        self.index = None
+        self.on_error = on_error
+
+    def __call__(self, path, template, params):
+        self.on_error([self.index] + path, template, params)
+
+_pending = weakref.WeakSet()
+
+def prebuild_all():
+    """
+    Builds every lazy :class:`Schema` that hasn't been used yet. Servers can
+    call this at startup, for example before forking workers, to pay the
+    building cost and find invalid schemas early.
+    """
+    for schema in list(_pending):
+        schema.build()
+
+_ATTRIBUTE = re.compile(r'[^\W\d]\w*\Z', re.UNICODE)
+
+def _field(key):
+    return key.key if isinstance(key, Marker) else key
+
+class Record(object):
+    """
+    A base class for compact result types with ``__slots__`` instead of a
+    dictionary, created with :meth:`Schema.as_record_type`. Like namedtuples,
+    records list their fields in ``_fields`` and can be converted with
+    ``_asdict()``. Extra keys accepted by a schema are kept in the ``_extra``
+    dictionary, which is ``None`` if there are none.
+    """
+
+    __slots__ = ('_extra',)
+    _fields = ()
+
+    def __init__(self, **values):
+        for name in self._fields:
+            setattr(self, name, values.pop(name, None))
+        self._extra = values or None
+
+    @classmethod
+    def _make(cls, values, extra=None):
+        record = cls.__new__(cls)
+        for name, value in zip(cls._fields, values):
+            setattr(record, name, value)
+        record._extra = extra
+        return record
+
+    def _asdict(self):
+        result = dict(self._extra or ())
+        for name in self._fields:
+            result[name] = getattr(self, name)
+        return result
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._asdict() == other._asdict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join('{}={!r}'.format(name, getattr(self, name)) for name in self._fields)
+        return '{}({})'.format(type(self).__name__, values)
+
+try:
+    array.array('q')
+    _INT_TYPECODE = 'q'
+except ValueError: # pragma: no cover
+    _INT_TYPECODE = 'l'
+
+def _typecode(validator):
+    if _factory(validator) is All and validator.args['validators']:
+        validator = validator.args['validators'][-1]
+    factory = _factory(validator)
+    if factory is Coerce:
+        kind = validator.args['type']
+    elif factory is Type:
+        kind = validator.args['expected']
+    else:
+        return None
+    return { int: _INT_TYPECODE, float: 'd' }.get(kind)
+
+class _Columns(object):
+    """
+    Collects the values of validated records into columns. Used as the
+    ``output`` of a schema, with ``row`` set to the index of the record.
+    Values that don't fit a typed column are added to ``errors``.
+    """
+
+    _extra = None
+
+    def __init__(self, fields, typecodes, size):
+        self._fields = fields
+        self.columns = []
+        self.empty = []
+        for field in fields:
+            typecode = typecodes.get(field)
+            if typecode is None:
+                empty = None
+                column = [empty] * (size or 0)
+            else:
+                empty = float('nan') if typecode in 'fd' else 0
+                column = array.array(typecode, [empty]) * (size or 0)
+            self.columns.append(column)
+            self.empty.append(empty)
+        self.row = 0
+        self.errors = []
+
+    def _make(self, values, extra=None):
+        row = self.row
+        for field, column, empty, value in zip(self._fields, self.columns, self.empty, values):
+            if value is None:
+                value = empty
+            try:
+                if len(column) > row:
+                    column[row] = value
+                else:
+                    column.append(value)
+            except (TypeError, OverflowError):
+                self.errors.append(Error("Does not fit the column type", [field]))
+
+    def clear(self):
+        row = self.row
+        for column, empty in zip(self.columns, self.empty):
+            if len(column) > row:
+                column[row] = empty
+            else:
+                column.append(empty)
+        self.errors = []
+
+class Limits(object):
+    """
+    Limits on the size of the data given to a schema. They are checked while
+    the data is copied, before any validator runs, so oversized data is
+    rejected with a :class:`decent.error.Invalid` without much work. ``None``
+    means no limit.
+
+    ``max_depth`` limits how deeply dictionaries, lists, tuples and sets are
+    nested, with the given data at depth 1. ``max_keys`` and ``max_items``
+    limit the size of each dictionary and of the other containers,
+    ``max_length`` the length of each string, bytes value or key, and
+    ``max_nodes`` the number of values in total.
+    """
+
+    DEPTH_ERROR = "Must not be nested more than {max} levels deep"
+    KEYS_ERROR = "Must have at most {max} keys"
+    ITEMS_ERROR = "Must have at most {max} items"
+    LENGTH_ERROR = "Must have a length of at most {max}"
+    NODES_ERROR = "Must have at most {max} values in total"
+
+    def __init__(self, max_depth=None, max_keys=None, max_items=None, max_length=None, max_nodes=None):
+        self.max_depth = max_depth
+        self.max_keys = max_keys
+        self.max_items = max_items
+        self.max_length = max_length
+        self.max_nodes = max_nodes
+
+
 class Marker(object):
     """
     A base class for key markers that wrap a key.
@@ -179,4 +1217,4 @@ class Optional(Marker):
     pass
 
 
-__all__ = ('Schema', 'Marker', 'Default', 'Optional',)
+__all__ = ('Schema', 'Ref', 'Record', 'Limits', 'Marker', 'Default', 'Optional', 'prebuild_all',)
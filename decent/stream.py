@@ -0,0 +1,333 @@
+import codecs
+import json
+import re
+
+import six
+
+from .error import Error, Invalid
+from .validators import List, _factory
+
+
+START_MAP = 'start_map'
+END_MAP = 'end_map'
+START_ARRAY = 'start_array'
+END_ARRAY = 'end_array'
+MAP_KEY = 'map_key'
+VALUE = 'value'
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+_NUMBER_CHARS = re.compile(r'[-+.eE0-9]*')
+_LITERALS = (('true', True), ('false', False), ('null', None))
+
+
+class _Lexer(object):
+    """
+    Splits JSON text read from a file object into tokens, keeping only the
+    unread part of the current chunk in memory.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+        self.decoder = None
+
+    def _fill(self):
+        """
+        Reads the next chunk into the buffer. Returns ``False`` at the end of
+        the input.
+        """
+        while not self.eof:
+            chunk = self.fp.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                if self.decoder is not None:
+                    chunk = self.decoder.decode(b'', True)
+            elif isinstance(chunk, six.binary_type):
+                if self.decoder is None:
+                    self.decoder = codecs.getincrementaldecoder('utf-8')()
+                chunk = self.decoder.decode(chunk)
+            if chunk:
+                self.offset += self.pos
+                self.buffer = self.buffer[self.pos:] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def error(self, message):
+        return ValueError("{} at character {}".format(message, self.offset + self.pos))
+
+    def token(self):
+        """
+        Returns the next token as a ``(kind, value)`` tuple, where the kind is
+        one of ``{}[]:,``, ``'string'`` or ``'scalar'``. Returns ``None`` at
+        the end of the input.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                break
+            if not self._fill():
+                return None
+
+        char = self.buffer[self.pos]
+        if char in '{}[]:,':
+            self.pos += 1
+            return char, None
+        if char == '"':
+            return 'string', self._string()
+        if char == '-' or char.isdigit():
+            return 'scalar', self._number()
+        return 'scalar', self._literal()
+
+    def _string(self):
+        # Find the closing quote first so the string is only decoded once.
+        search = 1
+        while True:
+            buffer, start = self.buffer, self.pos
+            end = buffer.find('"', start + search)
+            if end == -1:
+                search = len(buffer) - start
+                if not self._fill():
+                    raise self.error("Unterminated string")
+                continue
+            slash = end - 1
+            while buffer[slash] == '\\':
+                slash -= 1
+            if (end - slash) % 2 == 0:
+                search = end - start + 1
+                continue
+            try:
+                value, self.pos = json.decoder.scanstring(buffer, start + 1)
+            except ValueError:
+                raise self.error("Invalid string")
+            return value
+
+    def _number(self):
+        # Make sure the whole number is in the buffer before matching it.
+        while True:
+            end = _NUMBER_CHARS.match(self.buffer, self.pos).end()
+            if end < len(self.buffer) or not self._fill():
+                break
+        match = _NUMBER.match(self.buffer, self.pos)
+        if match is None or match.end() != end:
+            raise self.error("Invalid number")
+        self.pos = end
+        if match.group(1) or match.group(2):
+            return float(match.group())
+        return int(match.group())
+
+    def _literal(self):
+        while len(self.buffer) - self.pos < 5 and self._fill():
+            pass
+        for text, value in _LITERALS:
+            if self.buffer.startswith(text, self.pos):
+                self.pos += len(text)
+                return value
+        raise self.error("Invalid value")
+
+
+def _expect(lexer, kind):
+    token = lexer.token()
+    if token is None or token[0] != kind:
+        raise lexer.error("Expected '{}'".format(kind))
+    return token[1]
+
+
+def parse(fp, chunk_size=65536):
+    """
+    Parses the JSON document in the file object ``fp`` incrementally, without
+    holding more than one chunk of text in memory. Yields ``(event, value)``
+    tuples, where the event is one of :data:`START_MAP`, :data:`MAP_KEY`,
+    :data:`END_MAP`, :data:`START_ARRAY`, :data:`END_ARRAY` or :data:`VALUE`.
+    The value is the key for :data:`MAP_KEY` events and the scalar value for
+    :data:`VALUE` events, otherwise ``None``.
+
+    The file object can return either text or UTF-8 encoded bytes. Raises
+    ``ValueError`` for invalid JSON.
+    """
+    lexer = _Lexer(fp, chunk_size)
+    stack = []
+    token = lexer.token()
+
+    while True:
+        # Parse a value starting with the current token.
+        if token is None:
+            raise lexer.error("Expected a value")
+        kind, value = token
+        if kind == '{':
+            yield START_MAP, None
+            token = lexer.token()
+            if token is not None and token[0] == '}':
+                yield END_MAP, None
+            elif token is not None and token[0] == 'string':
+                yield MAP_KEY, token[1]
+                _expect(lexer, ':')
+                stack.append('{')
+                token = lexer.token()
+                continue
+            else:
+                raise lexer.error("Expected a key")
+        elif kind == '[':
+            yield START_ARRAY, None
+            token = lexer.token()
+            if token is not None and token[0] == ']':
+                yield END_ARRAY, None
+            else:
+                stack.append('[')
+                continue
+        elif kind in ('string', 'scalar'):
+            yield VALUE, value
+        else:
+            raise lexer.error("Expected a value")
+
+        # The value is complete: close containers until another value follows.
+        while stack:
+            token = lexer.token()
+            kind = token and token[0]
+            if kind == ',':
+                if stack[-1] == '{':
+                    key = _expect(lexer, 'string')
+                    yield MAP_KEY, key
+                    _expect(lexer, ':')
+                token = lexer.token()
+                break
+            elif kind == '}' and stack[-1] == '{':
+                stack.pop()
+                yield END_MAP, None
+            elif kind == ']' and stack[-1] == '[':
+                stack.pop()
+                yield END_ARRAY, None
+            else:
+                raise lexer.error("Expected ',' or a closing bracket")
+        else:
+            if lexer.token() is not None:
+                raise lexer.error("Extra data")
+            return
+
+
+def _build(event, value, events):
+    """
+    Builds the value starting with the given event from the rest of the
+    events, without recursion.
+    """
+    if event == VALUE:
+        return value
+
+    root = {} if event == START_MAP else []
+    containers = [root]
+    keys = [None]
+    for event, value in events:
+        if event == MAP_KEY:
+            keys[-1] = value
+            continue
+        if event == END_MAP or event == END_ARRAY:
+            containers.pop()
+            keys.pop()
+            if not containers:
+                return root
+            continue
+
+        if event == START_MAP:
+            value = {}
+        elif event == START_ARRAY:
+            value = []
+        parent = containers[-1]
+        if isinstance(parent, dict):
+            parent[keys[-1]] = value
+        else:
+            parent.append(value)
+        if event != VALUE:
+            containers.append(value)
+            keys.append(None)
+
+
+def _collect(error, path, invalid):
+    errors = error.errors if isinstance(error, Invalid) else [error]
+    for e in errors:
+        invalid.append(e.prefixed(path))
+
+
+def validate_json(fp, validator, path=(), callback=None, chunk_size=65536):
+    """
+    Validates the records of a JSON document in the file object ``fp``
+    incrementally, without loading the whole document into memory.
+
+    The records are the items of the array found at ``path``, a list of
+    object keys and array indexes leading to it. By default the document
+    itself must be an array. Each record is validated with ``validator``
+    (typically a :class:`decent.schema.Schema`) as soon as it has been
+    parsed. A :func:`decent.validators.List` validator can also be given, in
+    which case its item validator is used. Everything outside the records is
+    skipped without being built.
+
+    The result of every valid record is passed to ``callback``, and only one
+    record is held in memory at a time.
+
+    Returns the number of valid records. If any errors were encountered, an
+    :class:`decent.error.Invalid` with all of them is raised once the whole
+    document has been read. The error paths are the same as if the whole
+    document had been validated in memory.
+    """
+    if _factory(validator) is List:
+        validator = validator.args['validator']
+
+    path = list(path)
+    depth = len(path)
+    invalid = Invalid()
+    found = False
+    valid = 0
+
+    # The key or index of each enclosing container, and whether it is an array.
+    position = []
+    arrays = []
+
+    events = parse(fp, chunk_size)
+    for event, value in events:
+        if event == MAP_KEY:
+            position[-1] = value
+            continue
+
+        if event == END_MAP or event == END_ARRAY:
+            position.pop()
+            arrays.pop()
+        elif len(position) == depth + 1 and arrays[-1] and position[:-1] == path:
+            # A record: build and validate it.
+            record = _build(event, value, events)
+            try:
+                result = validator(record)
+            except Error as e:
+                _collect(e, path + [position[-1]], invalid)
+            else:
+                valid += 1
+                if callback is not None:
+                    callback(result)
+        elif len(position) == depth and position == path:
+            found = True
+            if event == START_ARRAY:
+                position.append(0)
+                arrays.append(True)
+                continue
+            invalid.append(Error("Must be a list", path))
+            _build(event, value, events)
+        elif event == START_MAP or event == START_ARRAY:
+            position.append(None if event == START_MAP else 0)
+            arrays.append(event == START_ARRAY)
+            continue
+
+        # A value was completed.
+        if arrays and arrays[-1]:
+            position[-1] += 1
+
+    if not found:
+        invalid.append(Error("This field is required.", path))
+    if len(invalid):
+        raise invalid
+    return valid
+
+
+__all__ = ('validate_json',)
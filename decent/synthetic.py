@@ -0,0 +1,469 @@
+"""
+Synthetic data generated from schemas, for load testing and benchmarks.
+"""
+
+import copy
+import itertools
+import math
+import random
+import uuid
+
+import six
+
+from .error import Error
+from .schema import Schema, Ref, Marker
+from .validators import (All, Any, Boolean, Coerce, Decode, Eq, In, Instance,
+    Length, List, Lower, Maybe, Msg, NotEmpty, NotIn, Range, Strip, Tagged,
+    Type, Upper, Uuid, _factory)
+from .validators import Default as DefaultValue
+
+
+MAX_DEPTH = 4
+"""
+Nested schemas and lists deeper than this are kept as small as their
+validators allow, so recursive schemas generate finite records.
+"""
+
+_SAMPLES = 16
+_TRIES = 32
+
+
+class _Plan(object):
+    """
+    How to generate values for a validator: ``valid`` is a function returning
+    a valid value, and every function in ``invalid`` returns a value that
+    fails one of its checks. The functions take the random generator and the
+    nesting depth.
+    """
+
+    __slots__ = ('valid', 'invalid', 'ready')
+
+    def __init__(self, valid=None, invalid=None):
+        self.valid = valid
+        self.invalid = invalid or []
+        self.ready = valid is not None
+
+
+def generate(schema, n=None, invalid_ratio=0.0, seed=None):
+    """
+    Yields ``n`` records generated from the given schema or validator, or
+    endless records if ``n`` is ``None``.
+
+    A share of ``invalid_ratio`` records is invalid. Every invalid record
+    breaks one check, and the checks are taken in turn, so every failure
+    branch of the schema is exercised: missing and unknown keys, values out
+    of range, wrong types and so on. The rest of the records are valid.
+
+    Records are generated from the arguments of the built-in validators. With
+    the same ``seed``, the same records are generated. A ``ValueError`` is
+    raised for validators that values can't be generated for, like custom
+    callables or :func:`decent.validators.Match`. ``entire`` validators of
+    schemas are not taken into account.
+    """
+    if not 0 <= invalid_ratio <= 1:
+        raise ValueError("invalid_ratio must be between 0 and 1.")
+
+    plan = _plan(schema, {})
+    if invalid_ratio and not plan.invalid:
+        raise ValueError("No invalid values can be generated for {!r}".format(schema))
+
+    rng = random.Random(seed)
+    valid = plan.valid
+    branches = itertools.cycle(plan.invalid) if invalid_ratio else None
+    chance = rng.random
+    counter = itertools.count() if n is None else six.moves.range(n)
+    for _ in counter:
+        if invalid_ratio and chance() < invalid_ratio:
+            yield next(branches)(rng, 0)
+        else:
+            yield valid(rng, 0)
+
+## Planning
+
+def _plan(validator, memo):
+    try:
+        return memo[id(validator)]
+    except KeyError:
+        pass
+
+    if isinstance(validator, Schema):
+        return _schema(validator, memo)
+    if isinstance(validator, Ref):
+        # A schema registers its plan before planning its fields, so this
+        # ends on references back to it.
+        plan = memo[id(validator)] = _plan(validator.resolved(), memo)
+        return plan
+
+    build = _PLANS.get(_factory(validator))
+    if build is None:
+        raise ValueError("Can't generate values for {!r}".format(validator))
+    plan = memo[id(validator)] = build(validator, validator.args, memo)
+    plan.ready = True
+    return plan
+
+def _fails(validator, value):
+    try:
+        validator(copy.deepcopy(value))
+    except Error:
+        return True
+    except Exception:
+        # Crashing the validator isn't one of its failure branches.
+        return False
+    return False
+
+def _passes(validator, value):
+    try:
+        validator(value)
+    except Exception:
+        return False
+    return True
+
+def _checked(validator, candidates):
+    """
+    Returns functions for the invalid candidates the validator rejects.
+    """
+    rng = random.Random(0)
+    return [candidate for candidate in candidates
+        if _fails(validator, candidate(rng, MAX_DEPTH))]
+
+def _constant(value):
+    return lambda rng, depth: value
+
+def _any_invalid(plan):
+    def generate(rng, depth):
+        branches = plan.invalid
+        return branches[rng.randrange(len(branches))](rng, depth)
+    return generate
+
+def _text(rng, length):
+    if not length:
+        return ''
+    return ('%0*x' % (length, rng.getrandbits(4 * length)))[:length]
+
+def _word(rng, depth):
+    return _text(rng, rng.randint(1, 12))
+
+## Schemas
+
+def _schema(schema, memo):
+    plan = memo[id(schema)] = _Plan()
+    fields = []
+    for key in sorted(schema.schema, key=str):
+        field = key.key if isinstance(key, Marker) else key
+        required = not isinstance(key, Marker)
+        fields.append((field, _plan(schema.schema[key], memo), required))
+
+    def valid(rng, depth):
+        record = {}
+        for field, field_plan, required in fields:
+            if required or (depth < MAX_DEPTH and rng.random() < 0.75):
+                record[field] = field_plan.valid(rng, depth + 1)
+        return record
+
+    def broken(field, generate):
+        def invalid(rng, depth):
+            record = valid(rng, depth)
+            record[field] = generate(rng, depth + 1)
+            return record
+        return invalid
+
+    def missing(field):
+        def invalid(rng, depth):
+            record = valid(rng, depth)
+            del record[field]
+            return record
+        return invalid
+
+    def extra(rng, depth):
+        record = valid(rng, depth)
+        record[_unknown_key(schema)] = _word(rng, depth)
+        return record
+
+    invalid = [_constant("Not a dictionary")]
+    for field, field_plan, required in fields:
+        if required:
+            invalid.append(missing(field))
+        if field_plan.ready:
+            invalid.extend(broken(field, generate) for generate in field_plan.invalid)
+        else:
+            # Recursive fields get a random invalid value when generated.
+            invalid.append(broken(field, _any_invalid(field_plan)))
+    if schema.extra_keys == Schema.REJECT:
+        invalid.append(extra)
+
+    plan.valid, plan.invalid, plan.ready = valid, invalid, True
+    return plan
+
+def _unknown_key(schema):
+    key = 'unknown'
+    while key in schema.schema:
+        key += '_'
+    return key
+
+## Combinators
+
+def _all(validator, args, memo):
+    plans = [_plan(step, memo) for step in args['validators']]
+
+    # Generate from the step whose valid values most often pass every step.
+    rng = random.Random(0)
+    best, most = None, 0
+    for plan in plans:
+        if plan.ready:
+            passed = sum(not _fails(validator, plan.valid(rng, MAX_DEPTH)) for _ in range(_SAMPLES))
+            if passed > most:
+                best, most = plan, passed
+    if best is None:
+        raise ValueError("Can't generate valid values for {!r}".format(validator))
+
+    def valid(rng, depth):
+        for _ in range(_TRIES):
+            value = best.valid(rng, depth)
+            if _passes(validator, value):
+                return value
+        raise ValueError("Can't generate valid values for {!r}".format(validator))
+
+    invalid = [generate for plan in plans for generate in plan.invalid]
+    return _Plan(valid, _checked(validator, invalid))
+
+def _any(validator, args, memo):
+    plans = [_plan(alternative, memo) for alternative in args['validators']]
+    if not plans:
+        raise ValueError("Can't generate valid values for {!r}".format(validator))
+
+    def valid(rng, depth):
+        return plans[rng.randrange(len(plans))].valid(rng, depth)
+
+    invalid = [generate for plan in plans for generate in plan.invalid]
+    return _Plan(valid, _checked(validator, invalid))
+
+def _maybe(validator, args, memo):
+    plan = _plan(args['validator'], memo)
+
+    def valid(rng, depth):
+        return None if rng.random() < 0.1 else plan.valid(rng, depth)
+
+    return _Plan(valid, _checked(validator, plan.invalid))
+
+def _msg(validator, args, memo):
+    return _plan(args['validator'], memo)
+
+def _default(validator, args, memo):
+    default = args['default']
+    return _Plan(lambda rng, depth: None if rng.random() < 0.5 else copy.deepcopy(default))
+
+def _tagged(validator, args, memo):
+    key = args['key']
+    tags = sorted(args['validators'], key=repr)
+    plans = [(tag, _plan(args['validators'][tag], memo)) for tag in tags]
+    if not plans:
+        raise ValueError("Can't generate valid values for {!r}".format(validator))
+
+    def valid(rng, depth):
+        tag, plan = plans[rng.randrange(len(plans))]
+        value = plan.valid(rng, depth)
+        if isinstance(value, dict):
+            value[key] = tag
+        return value
+
+    def broken(tag, generate):
+        def invalid(rng, depth):
+            value = generate(rng, depth)
+            if isinstance(value, dict):
+                value[key] = tag
+            return value
+        return invalid
+
+    unknown = 'unknown'
+    while unknown in args['validators']:
+        unknown += '_'
+    invalid = [_constant("Not a dictionary"), lambda rng, depth: {}, lambda rng, depth: { key: unknown }]
+    invalid.extend(broken(tag, generate) for tag, plan in plans for generate in plan.invalid)
+    invalid = _checked(validator, invalid)
+
+    # Recursive alternatives get a random invalid value when generated.
+    invalid.extend(broken(tag, _any_invalid(plan)) for tag, plan in plans if not plan.ready)
+    return _Plan(valid, invalid)
+
+## Values
+
+def _eq(validator, args, memo):
+    value = args['value']
+    candidates = [_constant(None), _constant("x"), _constant(0), _constant(-1)]
+    return _Plan(lambda rng, depth: copy.deepcopy(value), _checked(validator, candidates))
+
+def _typed(validator, expected):
+    kinds = expected if isinstance(expected, tuple) else (expected,)
+    for kind in kinds:
+        generate = _TYPES.get(kind)
+        if generate is not None:
+            break
+    else:
+        raise ValueError("Can't generate values for {!r}".format(validator))
+
+    candidates = [_constant("x"), _constant(1), _constant(None), _constant(1.5), lambda rng, depth: []]
+    return _Plan(generate, _checked(validator, candidates)[:1])
+
+def _type(validator, args, memo):
+    return _typed(validator, args['expected'])
+
+def _coerce(validator, args, memo):
+    kind = args['type']
+    generate = _COERCIONS.get(kind) or _TYPES.get(kind)
+    if generate is None:
+        raise ValueError("Can't generate values for {!r}".format(validator))
+    candidates = [_constant("x"), _constant(None), lambda rng, depth: []]
+    return _Plan(generate, _checked(validator, candidates))
+
+def _in(validator, args, memo):
+    values = args['values']
+    if not isinstance(values, (list, tuple, set, frozenset, dict)):
+        raise ValueError("Can't generate values for {!r}".format(validator))
+    values = sorted(values, key=repr)
+    if not values:
+        raise ValueError("Can't generate valid values for {!r}".format(validator))
+    candidates = [_constant("not-allowed"), _constant(None), _constant(-1)]
+    return _Plan(lambda rng, depth: values[rng.randrange(len(values))], _checked(validator, candidates))
+
+def _not_in(validator, args, memo):
+    values = args['values']
+    if not isinstance(values, (list, tuple, set, frozenset, dict)):
+        raise ValueError("Can't generate values for {!r}".format(validator))
+    values = sorted(values, key=repr)
+
+    def valid(rng, depth):
+        for _ in range(_TRIES):
+            value = _word(rng, depth)
+            if _passes(validator, value):
+                return value
+        raise ValueError("Can't generate valid values for {!r}".format(validator))
+
+    invalid = [lambda rng, depth: values[rng.randrange(len(values))]] if values else []
+    return _Plan(valid, invalid)
+
+def _boolean(validator, args, memo):
+    values = [True, False, "yes", "no", "t", "f", "True", "False", 0, 1, None]
+    return _Plan(lambda rng, depth: values[rng.randrange(len(values))],
+        [_constant("maybe"), _constant(1.5)])
+
+def _range(validator, args, memo):
+    low, high = args['min'], args['max']
+    if low is None:
+        low = (high if high is not None else 0) - 1000
+    if high is None:
+        high = low + 1000
+
+    if isinstance(low, float) or isinstance(high, float):
+        valid = lambda rng, depth: rng.uniform(low, high)
+    else:
+        low, high = int(math.ceil(low)), int(math.floor(high))
+        valid = lambda rng, depth: rng.randint(low, high)
+
+    invalid = [_constant("x")]
+    if args['min'] is not None:
+        invalid.append(_constant(args['min'] - 1))
+    if args['max'] is not None:
+        invalid.append(_constant(args['max'] + 1))
+    return _Plan(valid, _checked(validator, invalid))
+
+def _length(validator, args, memo):
+    low = args['min'] or 0
+    high = args['max'] if args['max'] is not None else low + 16
+    valid = lambda rng, depth: _text(rng, rng.randint(low, high))
+
+    invalid = [_constant(12345)]
+    if low:
+        invalid.append(lambda rng, depth: _text(rng, low - 1))
+    if args['max'] is not None:
+        invalid.append(lambda rng, depth: _text(rng, high + 1))
+    return _Plan(valid, _checked(validator, invalid))
+
+## Strings
+
+def _padded(rng, depth):
+    return " {} ".format(_word(rng, depth))
+
+def _padded_binary(rng, depth):
+    value = _padded(rng, depth)
+    return value.encode('ascii') if rng.random() < 0.5 else value
+
+def _string(validator, args, memo):
+    generate = _padded_binary if args.get('binary') else _padded
+    return _Plan(generate, _checked(validator, [_constant(""), _constant(None), _constant(123)]))
+
+def _uuid(validator, args, memo):
+    valid = lambda rng, depth: str(uuid.UUID(int=rng.getrandbits(128)))
+    return _Plan(valid, _checked(validator, [_constant("not-a-uuid"), _constant(123)]))
+
+def _decode(validator, args, memo):
+    valid = lambda rng, depth: _word(rng, depth).encode('ascii')
+    return _Plan(valid, _checked(validator, [_constant(b'\xff\xfe\xfd'), _constant(123)]))
+
+## Collections
+
+def _list(validator, args, memo):
+    item = _plan(args['validator'], memo)
+
+    def valid(rng, depth):
+        if depth >= MAX_DEPTH:
+            return []
+        return [item.valid(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+    def broken(generate):
+        def invalid(rng, depth):
+            items = valid(rng, depth)
+            items.insert(rng.randint(0, len(items)), generate(rng, depth + 1))
+            return items
+        return invalid
+
+    invalid = [_constant(123)]
+    if item.ready:
+        invalid.extend(broken(generate) for generate in item.invalid)
+    else:
+        invalid.append(broken(_any_invalid(item)))
+    return _Plan(valid, invalid)
+
+
+_TYPES = {
+    int: lambda rng, depth: rng.randint(-1000, 1000),
+    float: lambda rng, depth: rng.uniform(-1000, 1000),
+    bool: lambda rng, depth: rng.random() < 0.5,
+    six.text_type: _word,
+    six.binary_type: lambda rng, depth: _word(rng, depth).encode('ascii'),
+    list: lambda rng, depth: [],
+    dict: lambda rng, depth: {},
+    type(None): _constant(None),
+}
+
+_COERCIONS = {
+    int: lambda rng, depth: str(rng.randint(-1000, 1000)),
+    float: lambda rng, depth: repr(rng.uniform(-1000, 1000)),
+}
+
+_PLANS = {
+    All: _all,
+    Any: _any,
+    Maybe: _maybe,
+    Msg: _msg,
+    DefaultValue: _default,
+    Tagged: _tagged,
+    Eq: _eq,
+    Type: _type,
+    Instance: _type,
+    Coerce: _coerce,
+    In: _in,
+    NotIn: _not_in,
+    Boolean: _boolean,
+    Range: _range,
+    Length: _length,
+    Lower: _string,
+    Upper: _string,
+    Strip: _string,
+    NotEmpty: _string,
+    Uuid: _uuid,
+    Decode: _decode,
+    List: _list,
+}
+
+
+__all__ = ('generate',)
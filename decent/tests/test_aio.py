@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from decent.schema import *
+from decent.error import *
+from decent.validators import *
+from decent.aio import validate_stream
+
+## Helpers
+
+Item = Schema({ 'id': Range(min=0) })
+
+async def _items(count, invalid=()):
+    for i in range(count):
+        yield { 'id': -1 if i in invalid else i + 1 }
+
+def _run(generator):
+    async def collect():
+        return [result async for result in generator]
+    return asyncio.run(collect())
+
+## Validation
+
+def test_validate_stream():
+    results = _run(Item.avalidate_stream(_items(5, invalid=[2, 4]), chunk_size=2))
+
+    assert results[:2] == [{ 'id': 1 }, { 'id': 2 }]
+    assert isinstance(results[2], Invalid)
+    assert results[2].paths == [['id']]
+    assert results[3] == { 'id': 4 }
+    assert isinstance(results[4], Invalid)
+
+def test_validate_stream_plain_error():
+    def fail(value):
+        raise Error("Nope")
+
+    results = _run(validate_stream(fail, _items(1)))
+    assert isinstance(results[0], Invalid)
+    assert results[0].messages == ["Nope"]
+
+@pytest.mark.parametrize('chunk_size, max_inflight', [(1, 1), (3, 4), (10, 100)])
+def test_validate_stream_executor(chunk_size, max_inflight):
+    with ThreadPoolExecutor(2) as executor:
+        results = _run(Item.avalidate_stream(_items(50, invalid=[7]),
+            max_inflight=max_inflight, chunk_size=chunk_size, executor=executor))
+
+    assert len(results) == 50
+    assert [i for i, result in enumerate(results) if isinstance(result, Invalid)] == [7]
+    assert results[49] == { 'id': 50 }
+
+def test_validate_stream_path():
+    results = _run(validate_stream('decent.tests.test_aio:Item', _items(3, invalid=[1])))
+
+    assert results[0] == { 'id': 1 }
+    assert isinstance(results[1], Invalid)
+
+def test_validate_stream_process_pool():
+    with ProcessPoolExecutor(2) as executor:
+        results = _run(validate_stream('decent.tests.test_aio:Item', _items(20, invalid=[7]),
+            chunk_size=3, executor=executor))
+
+    assert len(results) == 20
+    assert [i for i, result in enumerate(results) if isinstance(result, Invalid)] == [7]
+    assert results[7].paths == [['id']]
+    assert results[19] == { 'id': 20 }
+
+def test_validate_stream_process_pool_schema():
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(TypeError):
+            _run(Item.avalidate_stream(_items(3), executor=executor))
+
+def test_validate_stream_cancels_pending():
+    started = []
+
+    def slow(value):
+        started.append(value)
+        time.sleep(0.05)
+        return value
+
+    async def items():
+        for i in range(10):
+            yield i
+        raise ValueError("Broken stream")
+
+    with ThreadPoolExecutor(1) as executor:
+        with pytest.raises(ValueError):
+            _run(validate_stream(slow, items(), max_inflight=100, chunk_size=1, executor=executor))
+
+    assert len(started) < 10
+
+def test_validate_stream_yields_to_loop():
+    ticks = []
+
+    async def main():
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(tick())
+        results = [result async for result in Item.avalidate_stream(_items(100), chunk_size=10)]
+        task.cancel()
+        return results
+
+    assert len(asyncio.run(main())) == 100
+    assert len(ticks) >= 5
+
+def test_validate_stream_backpressure():
+    read = []
+
+    async def items():
+        for i in range(100):
+            read.append(i)
+            yield { 'id': i }
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            stream = Item.avalidate_stream(items(), max_inflight=8, chunk_size=4, executor=executor)
+            await stream.__anext__()
+            await stream.aclose()
+
+    asyncio.run(main())
+    assert len(read) <= 12
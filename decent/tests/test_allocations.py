@@ -0,0 +1,171 @@
+"""
+Allocation budgets for representative schemas, measured with tracemalloc.
+
+Every scenario validates its data repeatedly and checks the blocks retained
+per call against a budget. The bytes retained per call (the result) and the
+peak memory of a single call (the working set, including the input copy) are
+only checked on CPython 3.11, which the byte budgets were calibrated on and
+which is the py311 tox environment. Run this file directly to print the
+numbers and the top allocation sites of every scenario.
+"""
+
+from __future__ import print_function
+
+import gc
+import os
+import platform
+import sys
+
+import pytest
+
+tracemalloc = pytest.importorskip('tracemalloc')
+
+from decent.schema import *
+from decent.error import *
+from decent.validators import *
+from decent.validators import Default as DefaultValue
+from decent.schema import Default
+
+
+CALLS = 100
+
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, os.path.join('*', 'tests', '*')),
+]
+
+## Scenarios
+
+Flat = Schema({
+    'id': Coerce(int),
+    'name': All(Strip(), NotEmpty()),
+    'email': All(Strip(), Lower()),
+    'active': Boolean(),
+})
+
+Nested = Schema({
+    'id': Range(min=0),
+    'owner': Flat,
+    'scores': List(Range(min=0, max=100)),
+    Optional('tags'): List(All(Strip(), Lower())),
+    Optional('note'): DefaultValue(""),
+})
+
+Defaults = Schema({
+    'id': Range(min=0),
+    Default('kind', default="item"): In(["item", "bundle"]),
+    Optional('size'): Range(min=0),
+})
+
+_flat = { 'id': "12", 'name': " Name ", 'email': "A@Example.com", 'active': "yes" }
+
+SCENARIOS = {
+    'flat': (Flat, _flat),
+    'flat_invalid': (Flat, { 'id': "x", 'name': " ", 'email': 1 }),
+    'nested': (Nested, { 'id': 1, 'owner': _flat, 'scores': [1, 2, 3, 4, 5], 'tags': [" A ", "B"] }),
+    'defaults': (Defaults, { 'id': 1 }),
+    'list': (List(Range(min=0)), list(range(1, 101))),
+}
+
+# Blocks retained per call, which don't depend on the interpreter's object
+# sizes.
+BLOCKS = {
+    'flat': 6,
+    'flat_invalid': 60,
+    'nested': 20,
+    'defaults': 5,
+    'list': 2,
+}
+
+# Bytes per call: (retained, peak), calibrated on CPython 3.11.
+CALIBRATED = platform.python_implementation() == 'CPython' and sys.version_info[:2] == (3, 11)
+BUDGETS = {
+    'flat': (450, 1400),
+    'flat_invalid': (4500, 5000),
+    'nested': (1100, 2800),
+    'defaults': (550, 1400),
+    'list': (200, 800),
+}
+
+## Harness
+
+def _call(validator, data):
+    try:
+        return validator(data)
+    except Error as e:
+        return e
+
+def measure(validator, data, calls=CALLS):
+    """
+    Returns the bytes and blocks retained per call, the peak bytes of a
+    single call, and a snapshot of what the calls retained.
+    """
+    _call(validator, data)
+    gc.collect()
+    results = []
+
+    tracemalloc.start()
+    try:
+        # Compile the filters before measuring.
+        tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+        # Measure the working set of a single call.
+        peak = None
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            result = _call(validator, data)
+            peak = tracemalloc.get_traced_memory()[1] - start
+            del result
+
+        before = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        for i in range(calls):
+            results.append(_call(validator, data))
+        after = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return size // calls, blocks // calls, peak, (before, after)
+
+def report(snapshots, limit=10):
+    """
+    Returns the top allocation sites between two snapshots as text.
+    """
+    before, after = snapshots
+    lines = []
+    for stat in after.compare_to(before, 'lineno')[:limit]:
+        frame = stat.traceback[0]
+        lines.append("{}:{}: {} blocks, {} bytes".format(
+            frame.filename, frame.lineno, stat.count_diff, stat.size_diff))
+    return "\n".join(lines)
+
+## Budgets
+
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_allocation_blocks(name):
+    validator, data = SCENARIOS[name]
+    size, blocks, peak, snapshots = measure(validator, data)
+
+    assert blocks <= BLOCKS[name], "{} retains {} blocks per call:\n{}".format(name, blocks, report(snapshots))
+
+@pytest.mark.skipif(not CALIBRATED, reason="Byte budgets are calibrated on CPython 3.11.")
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_allocation_budget(name):
+    validator, data = SCENARIOS[name]
+    retained, peak_budget = BUDGETS[name]
+    size, blocks, peak, snapshots = measure(validator, data)
+
+    assert size <= retained, "{} retains {} bytes per call:\n{}".format(name, size, report(snapshots))
+    if peak is not None:
+        assert peak <= peak_budget, "{} peaks at {} bytes per call:\n{}".format(name, peak, report(snapshots))
+
+if __name__ == '__main__':
+    for name in sorted(SCENARIOS):
+        size, blocks, peak, snapshots = measure(*SCENARIOS[name])
+        print("{}: {} bytes and {} blocks retained, {} bytes peak per call".format(name, size, blocks, peak))
+        print(report(snapshots))
+        print()
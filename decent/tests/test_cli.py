@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from decent.schema import *
+from decent.validators import *
+from decent.cli import *
+
+Item = Schema({
+    'id': Range(min=0),
+    'name': All(Strip(), NotEmpty()),
+})
+
+Row = Schema({
+    'id': All(Coerce(int), Range(min=0)),
+    'name': NotEmpty(),
+})
+
+def test_main(tmpdir, capsys):
+    input = tmpdir.join('input.jsonl')
+    input.write('{"id": 1, "name": "x"}\n')
+    output = tmpdir.join('output.jsonl')
+
+    assert main(['validate', '--schema', 'decent.tests.test_cli:Item', '--input', str(input),
+        '--output', str(output), '--workers', '1']) == 0
+    assert json.loads(output.read()) == { 'id': 1, 'name': "x" }
+    assert "1 valid" in capsys.readouterr().err
+
+def test_main_rejects(tmpdir, capsys):
+    input = tmpdir.join('input.csv')
+    input.write('id,name\n1,x\n2,\n')
+    rejects = tmpdir.join('rejects.jsonl')
+
+    assert main(['validate', '--schema', 'decent.tests.test_cli:Row', '--input', str(input),
+        '--format', 'csv', '--rejects', str(rejects), '--workers', '1']) == 1
+    assert "1 rejected" in capsys.readouterr().err
+    report = json.loads(rejects.read())
+    assert report['line'] == 3
+    assert report['record'] == { 'id': "2", 'name': "" }
+    assert report['errors'] == { 'name': "Must not be empty" }
@@ -25,6 +25,32 @@ def test_error_no_path_as_dict():
     error = Error("Hello, world!")
     assert error.as_dict() == { "": "Hello, world!" }
 
+def test_error_params():
+    assert Error("At least {}", params=(10,)).message == "At least 10"
+    assert Error("At most {max}", params={ 'max': 5 }).message == "At most 5"
+
+def test_error_params_template():
+    error = Error("At least {}", ['a'], (10,))
+    assert error.template == "At least {}"
+    assert error.params == (10,)
+
+    error.message = "Too small"
+    assert error.message == "Too small"
+    assert error.params is None
+
+def test_error_prefixed():
+    error = Error("At least {}", ['a'], (10,))
+    prefixed = error.prefixed([0, 'b'])
+
+    assert prefixed.path == [0, 'b', 'a']
+    assert prefixed.message == "At least 10"
+    assert error.path == ['a']
+
+def test_invalid_prefixed():
+    error = Invalid([Error("One", ['a']), Error("Two")])
+    assert error.prefixed([0]).paths == [[0, 'a'], [0]]
+    assert error.paths == [['a'], []]
+
 def test_invalid_as_dict():
     error = Invalid([Error("First", [0, 'first']), Error("Second", ['second', 'third'])])
     assert error.as_dict() == {
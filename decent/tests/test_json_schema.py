@@ -0,0 +1,270 @@
+import pytest
+
+from decent.schema import *
+from decent.error import *
+from decent.validators import Tagged, _factory
+from decent.json_schema import from_jsonschema
+
+
+def errors(validator, value):
+    try:
+        validator(value)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        return sorted((tuple(error.path), error.message) for error in e)
+    except Error as e:
+        return [(tuple(e.path), e.message)]
+
+## Types
+
+@pytest.mark.parametrize('kind, valid, invalid', [
+    ('string', u"text", 1),
+    ('integer', 1, True),
+    ('integer', 1, 1.5),
+    ('number', 1.5, "1"),
+    ('boolean', False, 0),
+    ('null', None, 0),
+    ('array', [1], (1,)),
+    ('object', {}, []),
+])
+def test_type(kind, valid, invalid):
+    validator = from_jsonschema({ 'type': kind })
+    assert validator(valid) == valid
+    with pytest.raises(Error):
+        validator(invalid)
+
+def test_type_list():
+    validator = from_jsonschema({ 'type': ['string', 'null'] })
+    assert validator(None) == None
+    assert validator(u"a") == u"a"
+    with pytest.raises(Error):
+        validator(1)
+
+## Keywords
+
+def test_bounds():
+    validator = from_jsonschema({ 'type': 'integer', 'minimum': 1, 'maximum': 10 })
+    assert validator(5) == 5
+    assert errors(validator, 0) == [((), "Must be at least 1")]
+    assert errors(validator, 11) == [((), "Must be at most 10")]
+
+def test_lengths():
+    validator = from_jsonschema({ 'type': 'string', 'minLength': 1, 'maxLength': 3 })
+    assert validator(u"abc") == u"abc"
+    assert errors(validator, u"") == [((), "Must have a length of at least 1")]
+
+    validator = from_jsonschema({ 'type': 'array', 'items': { 'type': 'integer' }, 'maxItems': 2 })
+    assert validator([1, 2]) == [1, 2]
+    assert errors(validator, [1, 2, 3]) == [((), "Must have a length of at most 2")]
+    assert errors(validator, [1, u"a"]) == [((1,), "Not of type int")]
+
+def test_enum_const():
+    validator = from_jsonschema({ 'enum': [u"a", u"b"] })
+    assert validator(u"a") == u"a"
+    with pytest.raises(Error):
+        validator(u"c")
+
+    validator = from_jsonschema({ 'const': 3 })
+    assert validator(3) == 3
+    with pytest.raises(Error):
+        validator(4)
+
+@pytest.mark.parametrize('doc, valid, invalid', [
+    ({ 'enum': [1, 2] }, [1, 2, 1.0], [True, u"1"]),
+    ({ 'enum': [True, None] }, [True, None], [1, 0, False]),
+    ({ 'enum': [[1, { 'a': 0 }]] }, [[1, { 'a': 0 }]], [[True, { 'a': 0 }], [1, { 'a': False }]]),
+    ({ 'const': 0 }, [0, 0.0], [False, None]),
+    ({ 'const': False }, [False], [0]),
+    ({ 'const': { 'a': [1] } }, [{ 'a': [1] }], [{ 'a': [True] }]),
+])
+def test_enum_const_types(doc, valid, invalid):
+    validator = from_jsonschema(doc)
+    for value in valid:
+        assert validator(value) == value
+    for value in invalid:
+        with pytest.raises(Error):
+            validator(value)
+
+def test_any_of_all_of():
+    validator = from_jsonschema({ 'anyOf': [{ 'type': 'integer' }, { 'type': 'string' }] })
+    assert validator(1) == 1
+    assert validator(u"a") == u"a"
+    with pytest.raises(Error):
+        validator(None)
+
+    validator = from_jsonschema({ 'allOf': [{ 'type': 'integer' }, { 'minimum': 0 }] })
+    assert validator(1) == 1
+    with pytest.raises(Error):
+        validator(-1)
+
+def test_boolean_schemas():
+    assert from_jsonschema(True)(object) is object
+    with pytest.raises(Error):
+        from_jsonschema(False)(1)
+
+@pytest.mark.parametrize('doc, valid, invalid', [
+    ({ 'type': ['string', 'null'], 'maxLength': 2 }, [None, u"ab"], [u"abc", 1]),
+    ({ 'type': ['integer', 'null'], 'minimum': 0 }, [None, 0], [-1, u"1"]),
+    ({ 'type': ['array', 'null'], 'items': { 'type': 'integer' }, 'maxItems': 1 }, [None, [1]], [[1, 2], [u"a"]]),
+    ({ 'maxLength': 2 }, [[1, 2, 3], 123, u"ab"], [u"abc"]),
+    ({ 'minimum': 0 }, [u"abc", True, None, 0], [-1, -0.5]),
+    ({ 'maxItems': 1 }, [u"abc", [1]], [[1, 2]]),
+    ({ 'items': { 'type': 'integer' } }, [u"abc", [1]], [[u"a"]]),
+    ({ 'properties': { 'a': { 'type': 'integer' } } }, [1, u"a", { 'a': 1 }], [{ 'a': u"x" }]),
+])
+def test_keywords_apply_to_their_type(doc, valid, invalid):
+    validator = from_jsonschema(doc)
+    for value in valid:
+        assert validator(value) == value
+    for value in invalid:
+        with pytest.raises(Error):
+            validator(value)
+
+@pytest.mark.parametrize('doc, value, message', [
+    ({ 'type': 'number', 'minimum': 0 }, -1, "Must be at least 0"),
+    ({ 'type': 'number', 'minimum': 0 }, -0.5, "Must be at least 0"),
+    ({ 'type': ['string', 'null'], 'maxLength': 2 }, u"abc", "Must have a length of at most 2"),
+    ({ 'type': ['integer', 'null'], 'minimum': 0 }, -1, "Must be at least 0"),
+    ({ 'type': ['array', 'null'], 'maxItems': 1 }, [1, 2], "Must have a length of at most 1"),
+    ({ 'type': ['string', 'number'], 'maxLength': 1, 'maximum': 1 }, 2, "Must be at most 1"),
+])
+def test_keyword_errors(doc, value, message):
+    try:
+        from_jsonschema(doc)(value)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == message
+
+def test_keyword_errors_nullable_object():
+    validator = from_jsonschema({ 'type': ['object', 'null'], 'properties': { 'a': { 'type': 'integer', 'minimum': 0 } } })
+    assert validator(None) is None
+    try:
+        validator({ 'a': -1 })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['a']]
+        assert e.messages == ["Must be at least 0"]
+
+## Objects
+
+def test_object():
+    validator = from_jsonschema({
+        'type': 'object',
+        'properties': {
+            'id': { 'type': 'integer', 'minimum': 1 },
+            'name': { 'type': 'string' },
+        },
+        'required': ['id', 'other'],
+    })
+    assert isinstance(validator, Schema)
+    assert validator({ 'id': 1, 'other': 2, 'extra': 3 }) == { 'id': 1, 'other': 2, 'extra': 3 }
+    assert errors(validator, { 'name': 1 }) == [
+        (('id',), "This field is required."),
+        (('name',), "Not of type str"),
+        (('other',), "This field is required."),
+    ]
+
+def test_object_additional_properties():
+    validator = from_jsonschema({ 'properties': { 'id': { 'type': 'integer' } }, 'additionalProperties': False })
+    assert errors(validator, { 'id': 1, 'extra': 1 }) == [(('extra',), "This field is unknown.")]
+
+## References
+
+def test_shared_reference():
+    validator = from_jsonschema({
+        'type': 'object',
+        'properties': {
+            'owner': { '$ref': '#/definitions/person' },
+            'editor': { '$ref': '#/definitions/person' },
+        },
+        'definitions': {
+            'person': { 'properties': { 'email': { 'type': 'string' } }, 'required': ['email'] },
+        },
+    })
+    assert validator.schema[Optional('owner')] is validator.schema[Optional('editor')]
+    assert errors(validator, { 'editor': {} }) == [(('editor', 'email'), "This field is required.")]
+
+def test_recursive_reference():
+    validator = from_jsonschema({
+        '$defs': {
+            'node': {
+                'type': 'object',
+                'properties': {
+                    'value': { 'type': 'integer' },
+                    'children': { 'type': 'array', 'items': { '$ref': '#/$defs/node' } },
+                },
+            },
+        },
+        '$ref': '#/$defs/node',
+    })
+    assert validator({ 'value': 1, 'children': [{ 'value': 2, 'children': [] }] }) == { 'value': 1, 'children': [{ 'value': 2 }] }
+    assert errors(validator, { 'children': [{ 'children': [{ 'value': u"x" }] }] }) == [
+        (('children', 0, 'children', 0, 'value'), "Not of type int"),
+    ]
+
+def test_root_reference():
+    validator = from_jsonschema({
+        'properties': { 'next': { '$ref': '#' }, 'value': { 'type': 'integer' } },
+    })
+    assert errors(validator, { 'next': { 'next': { 'value': u"x" } } }) == [
+        (('next', 'next', 'value'), "Not of type int"),
+    ]
+
+def test_invalid_reference():
+    with pytest.raises(SchemaError):
+        from_jsonschema({ '$ref': '#/definitions/missing' })
+    with pytest.raises(SchemaError):
+        from_jsonschema({ '$ref': 'http://example.com/schema.json' })
+
+## oneOf
+
+SHAPES = {
+    'circle': { 'properties': { 'kind': { 'const': 'circle' }, 'radius': { 'type': 'number' } }, 'required': ['kind', 'radius'] },
+    'square': { 'properties': { 'kind': { 'enum': ['square'] }, 'side': { 'type': 'number' } }, 'required': ['kind', 'side'] },
+}
+
+def test_one_of_constant():
+    validator = from_jsonschema({
+        'oneOf': [{ '$ref': '#/definitions/circle' }, { '$ref': '#/definitions/square' }],
+        'definitions': SHAPES,
+    })
+    assert _factory(validator) is Tagged
+    assert validator({ 'kind': 'square', 'side': 2 }) == { 'kind': 'square', 'side': 2 }
+    assert errors(validator, { 'kind': 'circle' }) == [(('radius',), "This field is required.")]
+    assert errors(validator, { 'kind': 'triangle' }) == [(('kind',), "Unknown value 'triangle'")]
+
+def test_one_of_discriminator():
+    shapes = dict((name, { 'properties': dict(shape['properties'], kind={ 'type': 'string' }) })
+        for name, shape in SHAPES.items())
+    validator = from_jsonschema({
+        'oneOf': [{ '$ref': '#/definitions/circle' }, { '$ref': '#/definitions/square' }],
+        'discriminator': { 'propertyName': 'kind' },
+        'definitions': shapes,
+    })
+    assert _factory(validator) is Tagged
+    assert validator({ 'kind': 'circle', 'radius': 1 }) == { 'kind': 'circle', 'radius': 1 }
+
+    validator = from_jsonschema({
+        'oneOf': [{ '$ref': '#/definitions/circle' }, { '$ref': '#/definitions/square' }],
+        'discriminator': { 'propertyName': 'kind', 'mapping': { 'c': '#/definitions/circle', 's': '#/definitions/square' } },
+        'definitions': shapes,
+    })
+    assert validator({ 'kind': 'c', 'radius': 1 }) == { 'kind': 'c', 'radius': 1 }
+
+def test_one_of_without_tags():
+    validator = from_jsonschema({ 'oneOf': [{ 'type': 'integer' }, { 'type': 'string' }] })
+    assert validator(1) == 1
+    assert validator(u"a") == u"a"
+
+## Unsupported
+
+@pytest.mark.parametrize('doc', [
+    { 'type': 'string', 'pattern': '^a' },
+    { 'additionalProperties': { 'type': 'string' } },
+    { 'items': [{ 'type': 'string' }] },
+    { 'type': 'date' },
+    [],
+])
+def test_unsupported(doc):
+    with pytest.raises(SchemaError):
+        from_jsonschema(doc)
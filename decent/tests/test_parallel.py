@@ -0,0 +1,131 @@
+import io
+import json
+
+import pytest
+
+from decent.schema import *
+from decent.validators import *
+from decent.parallel import *
+from decent.parallel import JSONL, CSV, Stats, load_validator, read_header, split, \
+    validate_file, validate_range
+
+Item = Schema({
+    'id': Range(min=0),
+    'name': All(Strip(), NotEmpty()),
+})
+
+def _write(tmpdir, count=100):
+    path = tmpdir.join('input.jsonl')
+    path.write(''.join(
+        json.dumps({ 'id': i if i % 10 else -1, 'name': "x" * (i % 7 + 1) }) + '\n'
+        for i in range(count)))
+    return path
+
+## Loading validators
+
+def test_load_validator():
+    assert load_validator('decent.validators:Range') is Range
+    assert load_validator('decent.schema:Schema.REJECT') == Schema.REJECT
+
+@pytest.mark.parametrize('path', ['decent.schema', ':Schema', 'decent.schema:'])
+def test_load_validator_invalid_path(path):
+    with pytest.raises(ValueError):
+        load_validator(path)
+
+## Splitting
+
+@pytest.mark.parametrize('parts', [1, 2, 3, 7, 1000])
+def test_split(tmpdir, parts):
+    path = _write(tmpdir)
+    data = path.read_binary()
+    ranges = split(str(path), parts)
+
+    assert len(ranges) <= parts
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end == next_start
+        assert data[end - 1:end] == b'\n'
+
+def test_split_empty(tmpdir):
+    path = tmpdir.join('empty')
+    path.write('')
+    assert split(str(path), 4) == []
+
+def test_split_start(tmpdir):
+    path = tmpdir.join('input.csv')
+    path.write('id,name\n1,a\n2,b\n')
+    header, start = read_header(str(path))
+
+    assert header == ['id', 'name']
+    assert split(str(path), 2, start)[0][0] == 8
+
+## Validating ranges
+
+def test_validate_range(tmpdir):
+    path = tmpdir.join('input.jsonl')
+    path.write('{"id": 1, "name": " One "}\n\n{"id": -1, "name": ""}\nnot json\n')
+    output = tmpdir.join('output')
+    size = len(path.read_binary())
+
+    stats, rejects, lines, written = validate_range(Item, str(path), 0, size, str(output))
+
+    assert (stats.valid, stats.rejected, lines) == (1, 2, 4)
+    assert written == output.size()
+    assert json.loads(output.read()) == { 'id': 1, 'name': "One" }
+    assert rejects[0] == {
+        'line': 3,
+        'offset': 28,
+        'record': { 'id': -1, 'name': "" },
+        'errors': { 'id': "Must be at least 0", 'name': "Must not be empty" },
+    }
+    assert rejects[1]['line'] == 4
+    assert rejects[1]['record'] == "not json"
+
+def test_validate_range_csv(tmpdir):
+    path = tmpdir.join('input.csv')
+    path.write('id,name\nx,a\n1\n')
+    header, start = read_header(str(path))
+
+    stats, rejects, lines, written = validate_range(Item, str(path), start, len(path.read_binary()),
+        format=CSV, header=header)
+
+    assert stats.rejected == 2
+    assert rejects[0]['errors'] == { 'id': "Not a number" }
+    assert list(rejects[1]['errors']) == ['']
+
+## Validating files
+
+@pytest.mark.parametrize('workers, parts', [(1, None), (2, None), (2, 1), (3, 50)])
+def test_validate_file(tmpdir, workers, parts):
+    path = _write(tmpdir)
+    output = io.BytesIO()
+    rejects = io.StringIO()
+
+    stats = validate_file('decent.tests.test_parallel:Item', str(path), output, rejects,
+        workers=workers, parts=parts)
+
+    assert stats.valid == 90
+    assert stats.rejected == 10
+    assert stats.bytes == path.size()
+    assert [json.loads(line)['id'] for line in output.getvalue().splitlines()] == \
+        [i for i in range(100) if i % 10]
+    reports = [json.loads(line) for line in rejects.getvalue().splitlines()]
+    assert [report['line'] for report in reports] == list(range(1, 101, 10))
+    assert [report['offset'] for report in reports] == sorted(report['offset'] for report in reports)
+    assert "records/s" in stats.report()
+
+## Stats
+
+def test_stats_merge():
+    first, second = Stats(), Stats()
+    first.valid, second.rejected = 2, 1
+    for i in range(99):
+        first.add_latency(0.000001)
+    second.add_latency(0.1)
+    first.merge(second)
+
+    assert first.records == 3
+    assert 0.000001 <= first.percentile(50) < 0.000002
+    assert 0.1 <= first.percentile(100) < 0.2
+    assert Stats().percentile(50) == 0.0
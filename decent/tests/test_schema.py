@@ -3,6 +3,7 @@ from pytest import mark
 
 from decent.schema import *
 from decent.error import *
+from decent.validators import All, Any, Coerce, Eq, Maybe, Msg, Range, List, Tagged, Type
 
 ## Helpers
 
@@ -35,6 +36,41 @@ def test_invalid_schema_validators(value):
             'a': value,
         })
 
+## Lazy building
+
+def test_lazy_schema_builds_on_first_use():
+    schema = Schema({ 'a': object() }, lazy=True)
+
+    with pytest.raises(SchemaError):
+        schema({ 'a': 1 })
+
+def test_lazy_schema_valid():
+    schema = Schema({ 'a': lambda x: x + 1 }, lazy=True)
+    assert schema({ 'a': 1 }) == { 'a': 2 }
+    assert schema.validator is schema.build()
+
+def test_lazy_schema_default(monkeypatch):
+    monkeypatch.setattr(Schema, 'LAZY', True)
+    schema = Schema({ 'a': object() })
+
+    with pytest.raises(SchemaError):
+        schema.build()
+    with pytest.raises(SchemaError):
+        Schema({ 'a': object() }, lazy=False)
+
+def test_prebuild_all():
+    valid = Schema({ 'a': ok }, lazy=True)
+    prebuild_all()
+    assert valid._validator is not None
+
+    invalid = Schema({ 'a': None }, lazy=True)
+    with pytest.raises(SchemaError):
+        prebuild_all()
+    del invalid
+    import gc
+    gc.collect()
+    prebuild_all()
+
 ## Callables
 
 def test_callable_transforms_value():
@@ -270,6 +306,44 @@ def test_nested_default_value():
 
     assert schema({}) == { 'test': { 'inner': 123 } }
 
+def test_default_value_copied():
+    def append(value):
+        value.append(1)
+        return value
+
+    schema = Schema({ Default('a', default=[0]): append })
+    assert schema({}) == { 'a': [0, 1] }
+    assert schema({}) == { 'a': [0, 1] }
+
+## Threads
+
+def test_shared_schema_threads():
+    from threading import Thread
+
+    shared = Error("Shared")
+    def error(value):
+        raise shared
+
+    schema = Schema({ 'a': List(Range(min=0)), 'b': error })
+    failures = []
+
+    def run():
+        for i in range(200):
+            try:
+                schema({ 'a': [1, -1], 'b': i })
+            except Invalid as e:
+                if sorted(e.paths) != [['a', 1], ['b']]:
+                    failures.append(e.paths)
+
+    threads = [Thread(target=run) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    assert shared.path == []
+
 ## Validator on entire schema
 
 def test_entire_validator_gets_all_data():
@@ -341,6 +415,554 @@ def test_entire_validator_raises_with_failures():
         assert "Entire" in e.messages
         assert "Nope" in e.messages
 
+## Error callback
+
+def _sink():
+    errors = []
+    def on_error(path, template, params):
+        errors.append((path, template, params))
+    return errors, on_error
+
+def test_on_error_valid():
+    errors, on_error = _sink()
+    schema = Schema({ 'a': Range(min=0) })
+    assert schema({ 'a': 1 }, on_error) == { 'a': 1 }
+    assert errors == []
+
+def test_on_error_invalid():
+    errors, on_error = _sink()
+    schema = Schema({ 'a': Range(min=0), 'b': List(Range(max=5)), 'c': ok }, extra_keys=Schema.REJECT)
+
+    assert schema({ 'a': -1, 'b': [1, 6], 'd': 1 }, on_error) is Schema.FAILED
+    assert sorted(errors) == [
+        (['a'], "Must be at least {min}", { 'min': 0, 'max': None }),
+        (['b', 1], "Must be at most {max}", { 'min': None, 'max': 5 }),
+        (['c'], Schema.REQUIRED_ERROR, None),
+        (['d'], Schema.REJECT_ERROR, None),
+    ]
+
+def test_on_error_not_a_dict():
+    errors, on_error = _sink()
+    assert Schema({})(None, on_error) is Schema.FAILED
+    assert errors == [([], "Data must be a dictionary.", None)]
+
+def test_on_error_entire():
+    def entire(data):
+        raise Error("Entire")
+
+    errors, on_error = _sink()
+    assert Schema({ 'a': ok }, entire=entire)({ 'a': 1 }, on_error) is Schema.FAILED
+    assert errors == [([], "Entire", None)]
+
+def test_validate_many():
+    errors, on_error = _sink()
+    schema = Schema({ 'a': Range(min=0) })
+
+    results = list(schema.validate_many([{ 'a': 1 }, { 'a': -1 }, { 'b': 2 }], on_error))
+    assert results == [{ 'a': 1 }, Schema.FAILED, Schema.FAILED]
+    assert errors == [
+        ([1, 'a'], "Must be at least {min}", { 'min': 0, 'max': None }),
+        ([2, 'a'], Schema.REQUIRED_ERROR, None),
+    ]
+
+def test_validate_many_without_callback():
+    schema = Schema({ 'a': Range(min=0) })
+    assert list(schema.validate_many([{ 'a': -1 }])) == [Schema.FAILED]
+
+## Record output
+
+def test_record_type():
+    Item = Schema({ 'name': ok, Optional('size'): ok }).as_record_type('Item')
+    assert Item.__name__ == 'Item'
+    assert Item._fields == ('name', 'size')
+    assert not hasattr(Item(), '__dict__')
+
+    item = Item(name="a")
+    assert item.name == "a"
+    assert item.size is None
+    assert item == Item(name="a", size=None)
+    assert item != Item(name="b")
+    assert repr(item) == "Item(name='a', size=None)"
+
+@mark.parametrize('key', [1, 'not valid', '_fields', '_asdict'])
+def test_record_type_invalid_key(key):
+    with pytest.raises(SchemaError):
+        Schema({ key: ok }).as_record_type()
+
+def test_record_output():
+    schema = Schema({ 'a': ok, Optional('b'): ok, Default('c', default=5): ok }, output=Record)
+    result = schema({ 'a': 0, 'd': 1 })
+
+    assert isinstance(result, schema.output)
+    assert (result.a, result.b, result.c) == (0, None, 5)
+    assert result._extra is None
+
+def test_record_output_extra_keys():
+    schema = Schema({ 'a': ok }, extra_keys=Schema.ACCEPT, output=Record)
+    result = schema({ 'a': 1, 'b': 2 })
+    assert result._extra == { 'b': 2 }
+    assert result._asdict() == { 'a': 1, 'b': 2 }
+
+def test_record_output_errors():
+    def fail(value):
+        raise Error("Nope")
+
+    schema = Schema({ 'a': fail, 'b': ok }, output=Record)
+    try:
+        schema({ 'a': 1 })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert sorted(e.paths) == [['a'], ['b']]
+
+def test_record_output_entire():
+    schema = Schema({ 'a': ok }, entire=lambda record: record._asdict(), output=Record)
+    assert schema({ 'a': 1 }) == { 'a': 1 }
+
+def test_namedtuple_output():
+    from collections import namedtuple
+    Point = namedtuple('Point', 'x y z')
+
+    schema = Schema({ 'x': ok, 'y': ok }, output=Point)
+    assert schema({ 'x': 1, 'y': 2 }) == Point(1, 2, None)
+
+    with pytest.raises(SchemaError):
+        Schema({ 'x': ok, 'w': ok }, output=Point)
+    with pytest.raises(SchemaError):
+        Schema({ 'x': ok }, extra_keys=Schema.ACCEPT, output=Point)
+
+## Lazy lists
+
+@mark.parametrize('validator', [
+    List(ok, lazy=True),
+    All(ok, List(ok, lazy=True)),
+    List(List(ok, lazy=True)),
+])
+def test_lazy_list_rejected(validator):
+    with pytest.raises(SchemaError):
+        Schema({ 'items': validator })
+
+## Recursive schemas
+
+def _tree():
+    node = Ref('node')
+    return node.resolve(Schema({
+        'value': Range(min=0),
+        Optional('children'): List(node),
+    }))
+
+def _chain(depth, leaf):
+    data = leaf
+    for i in range(depth):
+        data = { 'value': 1, 'children': [data] }
+    return data
+
+def test_ref_unresolved():
+    node = Ref()
+    schema = Schema({ 'child': node })
+    with pytest.raises(SchemaError):
+        schema({ 'child': {} })
+
+def test_recursive_valid():
+    data = { 'value': 1, 'children': [{ 'value': 2 }, { 'value': 3, 'children': [{ 'value': 4 }] }] }
+    assert _tree()(data) == data
+
+def test_recursive_errors():
+    Tree = _tree()
+    data = { 'value': -1, 'children': [
+        { 'value': 2, 'children': [{ 'value': -3 }, { }] },
+        "leaf",
+        { 'value': 4, 'children': 5 },
+    ]}
+
+    try:
+        Tree(data)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert sorted(e.as_dict().items()) == [
+            ('children.0.children.0.value', "Must be at least 0"),
+            ('children.0.children.1.value', Schema.REQUIRED_ERROR),
+            ('children.1', "Data must be a dictionary."),
+            ('children.2.children', "Must be a list"),
+            ('value', "Must be at least 0"),
+        ]
+
+def test_recursive_matches_nested():
+    leaf = Schema({ 'value': Range(min=0) })
+    middle = Schema({ 'value': Range(min=0), Optional('children'): List(leaf) })
+    nested = Schema({ 'value': Range(min=0), Optional('children'): List(middle) })
+    data = { 'value': 1, 'children': [{ 'value': 2, 'children': [{ 'value': -1 }, { 'value': 3, 'x': 1 }] }] }
+
+    for validator in (nested, _tree()):
+        try:
+            validator(data)
+            raise AssertionError("Expected error.")
+        except Invalid as e:
+            assert e.paths == [['children', 0, 'children', 0, 'value']]
+
+def test_recursive_deep():
+    Tree = _tree()
+    result = Tree(_chain(5000, { 'value': 2 }))
+    for i in range(5000):
+        assert result['value'] == 1
+        result, = result['children']
+    assert result == { 'value': 2 }
+
+    try:
+        Tree(_chain(5000, { 'value': -1 }))
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.path == ['children', 0] * 5000 + ['value']
+
+def test_recursive_on_error():
+    errors = []
+    result = _tree()(_chain(3, { }), lambda path, template, params: errors.append((path, template)))
+    assert result is Schema.FAILED
+    assert errors == [(['children', 0] * 3 + ['value'], Schema.REQUIRED_ERROR)]
+
+def test_recursive_in_plain_schema():
+    schema = Schema({ 'tree': _tree() })
+    try:
+        schema({ 'tree': _chain(2, { 'value': -1 }) })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.path == ['tree', 'children', 0, 'children', 0, 'value']
+
+def _linked(wrap, depth, leaf):
+    node = Ref('node')
+    schema = node.resolve(Schema({ 'value': Range(min=0), Optional('next'): wrap(node) }))
+    data = leaf
+    for i in range(depth):
+        data = { 'value': 1, 'next': data }
+    return schema, data
+
+@mark.parametrize('wrap', [
+    lambda node: Maybe(node),
+    lambda node: Any(Type(int), node),
+    lambda node: All(Type(dict), node),
+    lambda node: Tagged('kind', { 'a': node }, default=node),
+])
+def test_recursive_combinators_deep(wrap):
+    schema, data = _linked(wrap, 10000, { 'value': 2 })
+    result = schema(data)
+    for i in range(10000):
+        assert result['value'] == 1
+        result = result['next']
+    assert result == { 'value': 2 }
+
+    schema, data = _linked(wrap, 10000, { 'value': -1 })
+    try:
+        schema(data)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['next'] * 10000 + ['value']]
+        assert e.message == "Must be at least 0"
+
+def test_recursive_maybe_list_deep():
+    schema, data = _linked(lambda node: Maybe(List(node)), 0, { 'value': 1 })
+    for i in range(10000):
+        data = { 'value': 1, 'next': [data] }
+    assert schema(data)['next'][0]['next'][0]['value'] == 1
+    assert schema({ 'value': 1, 'next': None }) == { 'value': 1 }
+
+def test_recursive_msg():
+    schema, data = _linked(lambda node: Msg(node, "Bad node"), 10000, { 'value': -1 })
+    try:
+        schema(data)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['next'] * 10000 + ['value']]
+        assert e.message == "Bad node"
+
+def test_recursive_any_errors():
+    # Only the errors of the last alternative are reported.
+    schema, data = _linked(lambda node: Any(node, Eq("end")), 3, { 'value': -1 })
+    nested = Schema({ 'value': Range(min=0), Optional('next'): Any(Schema({ 'value': Range(min=0) }), Eq("end")) })
+    for validator, value in ((schema, data), (nested, { 'value': 1, 'next': { 'value': -1 } })):
+        try:
+            validator(value)
+            raise AssertionError("Expected error.")
+        except Invalid as e:
+            assert e.paths == [['next']]
+            assert e.message == "Not equal to end"
+
+    schema, data = _linked(lambda node: Any(Eq("end"), node), 3, "end")
+    assert schema(data)['next']['next']['next'] == "end"
+
+def test_recursive_tagged():
+    node = Ref()
+    schema = node.resolve(Schema({ Optional('child'): Tagged('kind', {
+        'leaf': Schema({ 'kind': Eq('leaf') }),
+        'node': node,
+    }), Optional('kind'): Eq('node') }))
+    data = { 'kind': 'leaf' }
+    for i in range(10000):
+        data = { 'kind': 'node', 'child': data }
+    assert schema(data)['kind'] == 'node'
+
+    data['child']['child'] = { 'kind': 'other' }
+    try:
+        schema(data)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['child', 'child', 'kind']]
+
+def test_copy():
+    from decent.schema import _copy
+
+    shared = [1, { 'a': (1, [2]) }]
+    data = { 'x': shared, 'y': shared, 'z': "z" }
+    result = _copy(data)
+
+    assert result == data
+    assert result['x'] is result['y']
+    assert result['x'] is not shared
+    assert result['x'][1]['a'][1] is not shared[1]['a'][1]
+
+    deep = []
+    for i in range(10000):
+        deep = [deep]
+    assert _copy(deep) is not deep
+
+## Fail-fast validation
+
+@mark.parametrize('data', [
+    { 'a': 1, 'b': [1] },
+    { 'a': 1, 'b': [1], 'c': 1 },
+    { 'a': 1 },
+    { 'a': -1, 'b': [1] },
+    { 'a': 1, 'b': [-1] },
+    { 'b': [1] },
+    { 'a': 1, 'b': [1], 'd': 1 },
+    None,
+])
+def test_is_valid(data):
+    schema = Schema({ 'a': Range(min=0), 'b': List(Range(min=0)), Optional('c'): ok }, extra_keys=Schema.REJECT)
+    try:
+        schema(data)
+        expected = True
+    except Invalid:
+        expected = False
+    assert schema.is_valid(data) == expected
+
+def test_is_valid_defaults():
+    schema = Schema({ Default('a', default=-1): Range(min=0) })
+    assert not schema.is_valid({})
+    assert schema.is_valid({ 'a': 1 })
+
+def test_is_valid_entire():
+    def entire(data):
+        if data['a'] > data['b']:
+            raise Error("Nope")
+        return data
+
+    schema = Schema({ 'a': ok, 'b': ok }, entire=entire)
+    assert schema.is_valid({ 'a': 1, 'b': 2 })
+    assert not schema.is_valid({ 'a': 2, 'b': 1 })
+
+def test_is_valid_copies_data():
+    schema = Schema({ 'a': List(lambda x: x + 1) })
+    data = { 'a': [1] }
+    assert schema.is_valid(data)
+    assert data == { 'a': [1] }
+
+def test_is_valid_adaptive(monkeypatch):
+    monkeypatch.setattr(Schema, 'REORDER_INTERVAL', 50)
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        sum(range(10000))
+        return value
+
+    schema = Schema({ 'slow': slow, 'cheap': Range(min=0) }, adaptive=True)
+    assert schema.check_order == ['slow', 'cheap']
+
+    for i in range(100):
+        assert not schema.is_valid({ 'slow': 1, 'cheap': -1 })
+    assert schema.check_order == ['cheap', 'slow']
+    assert len(calls) == 49
+
+    try:
+        schema({ 'slow': 1, 'cheap': -1 })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['cheap']]
+
+def test_is_valid_not_adaptive():
+    schema = Schema({ 'a': ok, 'b': ok })
+    schema.is_valid({ 'a': 1, 'b': 1 })
+    assert schema.check_order == ['a', 'b']
+
+## Column output
+
+def test_validate_to_columns():
+    schema = Schema({ 'id': Coerce(int), 'name': ok, Optional('score'): All(Range(min=0), Coerce(float)) })
+    records = [
+        { 'id': "1", 'name': "a", 'score': 1 },
+        { 'id': "x", 'name': "b" },
+        { 'id': 3, 'name': "c" },
+    ]
+    columns, valid, rejects = schema.validate_to_columns(records, types={ 'score': 'd' })
+
+    assert columns['id'].typecode == 'q'
+    assert list(columns['id']) == [1, 0, 3]
+    assert columns['name'] == ["a", None, "c"]
+    assert columns['score'][0] == 1.0
+    assert columns['score'][2] != columns['score'][2]
+    assert valid == bytearray([1, 0, 1])
+    assert [(i, e.paths) for i, e in rejects] == [(1, [['id']])]
+
+def test_validate_to_columns_generator():
+    schema = Schema({ 'id': Coerce(int) })
+    columns, valid, rejects = schema.validate_to_columns(iter([{ 'id': 1 }, None, { 'id': 2 }]))
+
+    assert list(columns['id']) == [1, 0, 2]
+    assert valid == bytearray([1, 0, 1])
+    assert [(i, e.messages) for i, e in rejects] == [(1, ["Data must be a dictionary."])]
+
+def test_validate_to_columns_type_mismatch():
+    schema = Schema({ 'id': ok, 'name': ok })
+    columns, valid, rejects = schema.validate_to_columns([{ 'id': "one", 'name': "a" }], types={ 'id': 'q' })
+
+    assert valid == bytearray([0])
+    assert columns['name'] == [None]
+    assert rejects[0][1].paths == [['id']]
+
+def test_validate_to_columns_numpy():
+    numpy = pytest.importorskip('numpy')
+    schema = Schema({ 'id': Type(int) })
+    columns, valid, rejects = schema.validate_to_columns([{ 'id': 1 }, { 'id': 2 }], numpy=True)
+
+    assert isinstance(columns['id'], numpy.ndarray)
+    assert columns['id'].tolist() == [1, 2]
+
+def test_validate_to_columns_entire():
+    with pytest.raises(SchemaError):
+        Schema({}, entire=ok).validate_to_columns([])
+
+## Limits
+
+def _limited(**limits):
+    return Schema({ 'items': List(ok), Optional('name'): ok }, extra_keys=Schema.ACCEPT, limits=Limits(**limits))
+
+def _deep(depth, kind=list):
+    data = kind()
+    for i in range(depth):
+        data = kind([data])
+    return data
+
+@mark.parametrize('limits, data, path, message', [
+    ({ 'max_depth': 2 }, { 'items': [[1]] }, ['items', 0], "Must not be nested more than 2 levels deep"),
+    ({ 'max_depth': 3 }, { 'items': _deep(50000) }, ['items', 0, 0], "Must not be nested more than 3 levels deep"),
+    ({ 'max_keys': 2 }, { 'items': [], 'a': 1, 'b': 2 }, [], "Must have at most 2 keys"),
+    ({ 'max_keys': 1 }, { 'items': [{ 'a': 1, 'b': 2 }] }, ['items', 0], "Must have at most 1 keys"),
+    ({ 'max_items': 2 }, { 'items': [1, 2, 3] }, ['items'], "Must have at most 2 items"),
+    ({ 'max_length': 5 }, { 'items': [], 'name': "abcdef" }, ['name'], "Must have a length of at most 5"),
+    ({ 'max_length': 5 }, { 'items': [b"abcdef"] }, ['items', 0], "Must have a length of at most 5"),
+    ({ 'max_length': 5 }, { 'items': [], 'abcdef': 1 }, [], "Must have a length of at most 5"),
+    ({ 'max_nodes': 5 }, { 'items': [1, 2, 3, 4, 5] }, [], "Must have at most 5 values in total"),
+    ({ 'max_depth': 3 }, { 'items': [_deep(50000, tuple)] }, ['items', 0, 0], "Must not be nested more than 3 levels deep"),
+    ({ 'max_items': 2 }, { 'items': [(1, 2, 3)] }, ['items', 0], "Must have at most 2 items"),
+    ({ 'max_items': 2 }, { 'items': [frozenset([1, 2, 3])] }, ['items', 0], "Must have at most 2 items"),
+    ({ 'max_length': 5 }, { 'items': [set(["abcdef"])] }, ['items', 0, 0], "Must have a length of at most 5"),
+    ({ 'max_nodes': 5 }, { 'items': [(1, 2), (3, 4)] }, [], "Must have at most 5 values in total"),
+])
+def test_limits(limits, data, path, message):
+    schema = _limited(**limits)
+    try:
+        schema(data)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert len(e) == 1
+        assert e[0].path == path
+        assert e[0].message == message
+    assert not schema.is_valid(data)
+
+def test_limits_valid():
+    schema = _limited(max_depth=3, max_keys=2, max_items=3, max_length=5, max_nodes=10)
+    data = { 'items': [[1], { 'a': "abcde" }], 'name': "abcde" }
+    result = schema(data)
+    assert result == data
+    assert result['items'][1] is not data['items'][1]
+    assert schema.is_valid(data)
+
+def test_limits_tuples():
+    schema = _limited(max_depth=4, max_items=3)
+    shared = [1]
+    data = { 'items': [(shared, { 'a': shared }), frozenset([(1, "a")])] }
+    result = schema(data)
+    assert result == data
+    assert result['items'][0] is not data['items'][0]
+    assert result['items'][0][0] is not shared
+    assert result['items'][0][1]['a'] is result['items'][0][0]
+    assert schema.is_valid(data)
+
+def test_limits_before_validators():
+    calls = []
+    schema = Schema({ 'name': calls.append }, limits=Limits(max_length=5))
+    with pytest.raises(Invalid):
+        schema({ 'name': "abcdef" })
+    assert calls == []
+
+def test_limits_on_error():
+    errors = []
+    schema = _limited(max_items=1)
+    assert schema({ 'items': [1, 2] }, on_error=lambda *args: errors.append(args)) is Schema.FAILED
+    assert errors == [(['items'], "Must have at most {max} items", { 'max': 1 })]
+
+def test_limits_validate_many():
+    errors = []
+    schema = _limited(max_items=1)
+    results = list(schema.validate_many([{ 'items': [1] }, { 'items': [1, 2] }], lambda *args: errors.append(args)))
+    assert results == [{ 'items': [1] }, Schema.FAILED]
+    assert errors == [([1, 'items'], "Must have at most {max} items", { 'max': 1 })]
+
+def test_limits_columns():
+    schema = Schema({ 'name': ok }, limits=Limits(max_length=5))
+    columns, valid, rejects = schema.validate_to_columns([{ 'name': "abcde" }, { 'name': "abcdef" }])
+    assert valid == bytearray([1, 0])
+    assert rejects[0][0] == 1
+    assert rejects[0][1].paths == [['name']]
+
+def test_limits_columns_iterator():
+    schema = Schema({ 'id': Type(int), 'name': ok }, limits=Limits(max_length=5))
+    records = [{ 'id': 1, 'name': "a" }, { 'id': 2, 'name': "abcdef" }, { 'id': 3, 'name': "c" }]
+    columns, valid, rejects = schema.validate_to_columns(iter(records))
+    assert valid == bytearray([1, 0, 1])
+    assert list(columns['id']) == [1, 0, 3]
+    assert columns['name'] == ["a", None, "c"]
+    assert list(columns['id']) == list(schema.validate_to_columns(records)[0]['id'])
+
+def test_limits_nested_recursive():
+    node = Ref()
+    note = Schema({ 'text': ok }, limits=Limits(max_length=5))
+    schema = node.resolve(Schema({ Optional('note'): note, Optional('next'): node }))
+    assert schema({ 'next': { 'note': { 'text': "abcde" } } }) == { 'next': { 'note': { 'text': "abcde" } } }
+    try:
+        schema({ 'next': { 'note': { 'text': "abcdef" } } })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['next', 'note', 'text']]
+        assert e.message == "Must have a length of at most 5"
+
+def test_limits_recursive_deep():
+    node = Ref()
+    schema = node.resolve(Schema({ Optional('next'): node }, limits=Limits(max_depth=20000)))
+    data = {}
+    for i in range(10000):
+        data = { 'next': data }
+    assert schema(data) is not None
+
+def test_limits_default():
+    schema = Schema({ 'name': ok })
+    try:
+        Schema.LIMITS = Limits(max_length=5)
+        with pytest.raises(Invalid):
+            schema({ 'name': "abcdef" })
+    finally:
+        Schema.LIMITS = None
+    assert schema({ 'name': "abcdef" }) == { 'name': "abcdef" }
+
 ## Markers
 
 def test_marker_str():
@@ -0,0 +1,126 @@
+import io
+import json
+
+import pytest
+
+from decent.schema import *
+from decent.error import *
+from decent.validators import *
+from decent.stream import *
+from decent.stream import parse, START_MAP, MAP_KEY, END_MAP, START_ARRAY, END_ARRAY, VALUE
+
+## Helpers
+
+Item = Schema({
+    'id': Range(min=0),
+    'name': All(Strip(), NotEmpty()),
+    Optional('tags'): List(NotEmpty()),
+})
+
+def _file(document, binary=False):
+    text = json.dumps(document)
+    if binary:
+        return io.BytesIO(text.encode('utf-8'))
+    return io.StringIO(text)
+
+def _in_memory_paths(validator, document):
+    try:
+        validator(document)
+    except Invalid as e:
+        return sorted(e.paths)
+    return []
+
+## Parsing
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 65536])
+@pytest.mark.parametrize('binary', [False, True])
+def test_parse_events(chunk_size, binary):
+    document = { 'a': [1, -2.5e3, { 'b': None }], 'c': "x\"\\y\u00e9", 'd': [True, False, []] }
+    events = list(parse(_file(document, binary), chunk_size))
+
+    assert events[:3] == [(START_MAP, None), (MAP_KEY, 'a'), (START_ARRAY, None)]
+    assert (VALUE, -2500.0) in events
+    assert (VALUE, "x\"\\y\u00e9") in events
+    assert events[-1] == (END_MAP, None)
+
+@pytest.mark.parametrize('text', [
+    '', '[', '[1,]', '{"a"}', '{"a":1,}', '[1 2]', '"abc', '1.', '-', 'tru', '[1]]', '{1:2}', '{"a":',
+])
+def test_parse_invalid(text):
+    with pytest.raises(ValueError):
+        list(parse(io.StringIO(text), 2))
+
+## Validation
+
+def test_validate_json_top_level():
+    results = []
+    count = validate_json(_file([
+        { 'id': 1, 'name': " One " },
+        { 'id': 2, 'name': "Two", 'tags': ["a"] },
+    ]), Item, callback=results.append)
+
+    assert count == 2
+    assert results == [
+        { 'id': 1, 'name': "One" },
+        { 'id': 2, 'name': "Two", 'tags': ["a"] },
+    ]
+
+def test_validate_json_list_validator():
+    results = []
+    validate_json(_file([{ 'id': 1, 'name': "One" }]), List(Item), callback=results.append)
+    assert results == [{ 'id': 1, 'name': "One" }]
+
+def test_validate_json_nested_path():
+    document = {
+        'meta': { 'items': "not these" },
+        'data': { 'items': [{ 'id': 1, 'name': "One" }, { 'id': -1, 'name': "" }] },
+    }
+    results = []
+
+    try:
+        validate_json(_file(document), Item, path=['data', 'items'], callback=results.append)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert results == [{ 'id': 1, 'name': "One" }]
+        assert sorted(e.paths) == [['data', 'items', 1, 'id'], ['data', 'items', 1, 'name']]
+
+@pytest.mark.parametrize('chunk_size', [3, 65536])
+def test_validate_json_error_paths_match_in_memory(chunk_size):
+    document = { 'items': [
+        { 'id': 1, 'name': "One", 'tags': ["a", "", "b", ""] },
+        { 'id': "two" },
+        "three",
+        { 'id': 4, 'name': "Four" },
+    ]}
+    schema = Schema({ 'items': List(Item) })
+
+    try:
+        validate_json(_file(document), Item, path=['items'], chunk_size=chunk_size)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert sorted(e.paths) == _in_memory_paths(schema, document)
+
+def test_validate_json_index_path():
+    document = [[{ 'id': 1, 'name': "One" }], [{ 'id': 2, 'name': "" }]]
+
+    try:
+        validate_json(_file(document), Item, path=[1])
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [[1, 0, 'name']]
+
+def test_validate_json_not_a_list():
+    try:
+        validate_json(_file({ 'items': { 'id': 1 } }), Item, path=['items'])
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['items']]
+        assert e.message == "Must be a list"
+
+def test_validate_json_missing_path():
+    try:
+        validate_json(_file({ 'other': [] }), Item, path=['items'])
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['items']]
+        assert e.message == "This field is required."
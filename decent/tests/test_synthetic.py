@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from decent.schema import *
+from decent.error import *
+from decent.validators import *
+from decent.schema import Default
+from decent.synthetic import generate, _plan
+
+
+Item = Schema({
+    'id': Coerce(int),
+    'name': All(Strip(), Length(min=1, max=20)),
+    'email': All(Strip(), Lower()),
+    'active': Boolean(),
+    'score': Range(min=0, max=100),
+    'kind': In(["item", "bundle"]),
+    'uuid': Uuid(),
+    'value': Any(Eq(1), Type(str)),
+    'limit': Maybe(Range(max=5)),
+    Optional('tags'): List(All(Strip(), NotEmpty())),
+    Default('size', default=1): Range(min=1),
+}, extra_keys=Schema.REJECT)
+
+def _valid(schema, record):
+    try:
+        schema(record)
+        return True
+    except Invalid:
+        return False
+
+## Records
+
+def test_generate_valid():
+    records = list(generate(Item, 500, seed=1))
+    assert len(records) == 500
+    assert all(_valid(Item, record) for record in records)
+
+def test_generate_invalid():
+    records = list(generate(Item, 500, invalid_ratio=1, seed=1))
+    assert not any(_valid(Item, record) for record in records)
+
+def test_generate_ratio():
+    valid = sum(_valid(Item, record) for record in generate(Item, 1000, invalid_ratio=0.3, seed=1))
+    assert 600 < valid < 800
+
+def test_generate_seed():
+    assert list(generate(Item, 50, invalid_ratio=0.5, seed=7)) == list(generate(Item, 50, invalid_ratio=0.5, seed=7))
+    assert list(generate(Item, 50, seed=7)) != list(generate(Item, 50, seed=8))
+
+def test_generate_endless():
+    records = generate(Item, seed=1)
+    assert len([next(records) for _ in range(10)]) == 10
+
+def test_generate_validator():
+    validator = All(Coerce(int), Range(min=1, max=10))
+    for value in generate(validator, 100, seed=1):
+        assert 1 <= validator(value) <= 10
+
+## Failure branches
+
+def test_every_branch_fails():
+    rng = random.Random(0)
+    for branch in _plan(Item, {}).invalid:
+        assert not _valid(Item, branch(rng, 0))
+
+def test_every_message():
+    messages = set()
+    for record in generate(Item, 200, invalid_ratio=1, seed=1):
+        try:
+            Item(record)
+        except Invalid as e:
+            messages.update(e.messages)
+    for message in ["This field is required.", "This field is unknown.", "Must be at most 100",
+            "Not an allowed value", "Must have a length of at least 1", "Not a boolean value."]:
+        assert message in messages
+
+def test_recursive():
+    node = Ref()
+    Node = node.resolve(Schema({
+        'name': NotEmpty(),
+        Optional('children'): List(node),
+    }))
+    assert all(_valid(Node, record) for record in generate(Node, 200, seed=1))
+    assert not any(_valid(Node, record) for record in generate(Node, 200, invalid_ratio=1, seed=1))
+
+def test_tagged():
+    validator = Tagged('type', {
+        'circle': Schema({ 'type': Eq('circle'), 'radius': Range(min=0) }),
+        'square': Schema({ 'type': Eq('square'), 'side': Range(min=0) }),
+    })
+    for value in generate(validator, 100, seed=1):
+        validator(value)
+    for value in generate(validator, 100, invalid_ratio=1, seed=1):
+        with pytest.raises(Error):
+            validator(value)
+
+## Unsupported
+
+def test_unsupported_validator():
+    with pytest.raises(ValueError):
+        next(generate(Schema({ 'name': lambda x: x }), 1))
+
+def test_invalid_ratio():
+    with pytest.raises(ValueError):
+        next(generate(Item, 1, invalid_ratio=2))
+
+def test_no_invalid_values():
+    with pytest.raises(ValueError):
+        next(generate(Coerce(str), 1, invalid_ratio=0.5))
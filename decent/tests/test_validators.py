@@ -1,8 +1,76 @@
+import numbers
+import re
+
 import six
 import pytest
 
 from decent.validators import *
-from decent.error import Error
+from decent.error import Error, Invalid
+
+## Built-in validators
+
+def test_builtin_args():
+    range = Range(0, max_message="Custom")
+    assert range.factory is Range
+    assert range.args == {
+        'min': 0,
+        'max': None,
+        'min_message': "Must be at least {min}",
+        'max_message': "Custom",
+    }
+    assert All(1, 2).args == { 'validators': (1, 2) }
+    assert Uuid(to_uuid=False).args == { 'to_uuid': False, 'binary': False }
+
+def test_builtin_interned():
+    assert Range(0, 200) is Range(min=0, max=200)
+    assert Range(0, 200) == Range(0, 200)
+    assert hash(Strip()) == hash(Strip())
+    assert All(Strip(), NotEmpty()) is All(Strip(), NotEmpty())
+    assert Instance((int, str)) is Instance((int, str))
+
+@pytest.mark.parametrize('first, second', [
+    (Eq(1), Eq(True)),
+    (Eq(1), Eq(1.0)),
+    (Range(min=0.0), Range(min=-0.0)),
+    (Eq((1,)), Eq((True,))),
+    (Range(0, 200), Range(0, 201)),
+    (Coerce(int), Coerce(float)),
+])
+def test_builtin_interned_different(first, second):
+    assert first is not second
+
+def test_builtin_unhashable_not_interned():
+    assert Eq([1]) is not Eq([1])
+    assert In([1, 2]) is not In([1, 2])
+
+def test_builtin_interned_large():
+    from decent.validators import _intern_key, _Identity
+    values = frozenset(range(1000))
+    assert In(values) is In(values)
+    assert In(values) is not In(frozenset(range(1000)))
+    assert isinstance(_intern_key(values), _Identity)
+    assert In(frozenset(range(10))) is In(frozenset(range(10)))
+
+def test_builtin_interned_freed():
+    import gc
+    import weakref
+    ref = weakref.ref(Range(0, 12345))
+    gc.collect()
+    assert ref() is None
+
+def test_shared_error_not_changed():
+    shared = Error("Shared")
+    def error(x):
+        raise shared
+
+    for validator in (List(error), List(error, lazy=True)):
+        for i in range(2):
+            try:
+                list(validator([1]))
+                raise AssertionError("Expected error.")
+            except Invalid as e:
+                assert e.paths == [[0]]
+    assert shared.path == []
 
 ## All
 
@@ -24,6 +92,42 @@ def test_all_error():
     except Error as e:
         assert e.message == "No"
 
+def test_all_nested():
+    def add_one(x):
+        return x + 1
+    all = All(add_one, All(add_one, add_one), add_one)
+
+    assert all(0) == 4
+
+def _chain(*validators):
+    def chained(value):
+        for validator in validators:
+            value = validator(value)
+        return value
+    return chained
+
+@pytest.mark.parametrize('validators', [
+    (Strip(), Lower(), NotEmpty(), Length(max=5)),
+    (NotEmpty(), Strip(), Upper(), Length(min=2, max_message="Max {max}")),
+    (Length(min=1), Strip(), NotEmpty()),
+    (Strip(), lambda x: x + "!" if isinstance(x, str) else x, Lower(), Length(max=3)),
+])
+@pytest.mark.parametrize('input', [
+    "  Hello ", "ABC", "  ", "", "toolongvalue", None, 123, [], ["a", "b"], object(),
+])
+def test_all_fused_strings(validators, input):
+    fused = All(*validators)
+    chained = _chain(*validators)
+
+    try:
+        expected = chained(input)
+    except Error as e:
+        with pytest.raises(Error) as info:
+            fused(input)
+        assert info.value.message == e.message
+    else:
+        assert fused(input) == expected
+
 ## Any
 
 def test_any_first():
@@ -81,6 +185,128 @@ def test_any_raises_other_exceptions_instantly():
     except Exception as e:
         assert str(e) == "No"
 
+def test_any_skips_incompatible_types():
+    called = []
+    def opaque(x):
+        called.append(x)
+        raise Error("Opaque")
+    any = Any(Type(int), opaque, Range(min=0), Type(str))
+
+    assert any("abc") == "abc"
+    assert called == ["abc"]
+
+def test_any_dispatch_keeps_order():
+    any = Any(Instance(int), Coerce(str), Type(int))
+
+    assert any(123) == 123
+    assert any(1.5) == "1.5"
+
+def test_any_dispatch_keeps_last_error():
+    any = Any(Type(str), Range(min=0), Type(int, "Last"))
+
+    try:
+        any(-1.5)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Last"
+
+    try:
+        any({})
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Last"
+
+def test_any_dispatch_schema():
+    from decent.schema import Schema
+    any = Any(Type(int), Schema({ 'a': Type(int) }), List(Type(int)))
+
+    assert any(1) == 1
+    assert any({ 'a': 1 }) == { 'a': 1 }
+    assert any([1, 2]) == [1, 2]
+
+    try:
+        any([1, "2"])
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.path == [1]
+
+## Tagged
+
+def test_tagged_selects_validator():
+    called = []
+    def first(x):
+        called.append('first')
+        return 1
+    def second(x):
+        called.append('second')
+        return 2
+    tagged = Tagged('type', { 'a': first, 'b': second })
+
+    assert tagged({ 'type': 'b' }) == 2
+    assert called == ['second']
+
+def test_tagged_raises_selected_error():
+    def fail(x):
+        raise Invalid([Error("Selected", ['field'])])
+    def other(x):
+        raise Error("Other")
+    tagged = Tagged('type', { 'a': fail, 'b': other })
+
+    try:
+        tagged({ 'type': 'a' })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert len(e) == 1
+        assert e.path == ['field']
+        assert e.message == "Selected"
+
+@pytest.mark.parametrize('input', [{ 'type': 'c' }, { 'type': [] }])
+def test_tagged_unknown(input):
+    tagged = Tagged('type', { 'a': lambda x: x })
+
+    try:
+        tagged(input)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.path == ['type']
+        assert e.message == "Unknown value " + repr(input['type'])
+
+def test_tagged_unknown_custom_message():
+    tagged = Tagged('type', { 'a': lambda x: x }, message="Bad {}")
+
+    try:
+        tagged({ 'type': 'c' })
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Bad c"
+
+def test_tagged_missing():
+    tagged = Tagged('type', { 'a': lambda x: x })
+
+    try:
+        tagged({})
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.path == ['type']
+        assert e.message == "This field is required."
+
+def test_tagged_default():
+    tagged = Tagged('type', { 'a': lambda x: 1 }, default=lambda x: 2)
+
+    assert tagged({ 'type': 'a' }) == 1
+    assert tagged({ 'type': 'c' }) == 2
+    assert tagged({}) == 2
+
+@pytest.mark.parametrize('input', [None, 123, [], "type"])
+def test_tagged_not_dict(input):
+    tagged = Tagged('type', { 'a': lambda x: x })
+
+    try:
+        tagged(input)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must be a dictionary"
+
 ## Maybe
 
 def test_maybe_none():
@@ -111,6 +337,30 @@ def test_msg_mutates_single_error():
     except Error as e:
         assert e.message == "This message"
 
+def test_msg_shared_error():
+    shared = Error("Not this message", ['a'])
+    def error(x):
+        raise shared
+    msg = Msg(error, "This message")
+
+    try:
+        msg(123)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "This message"
+        assert e.path == ['a']
+        assert shared.message == "Not this message"
+
+def test_msg_invalid():
+    msg = Msg(List(Range(min=0)), "This message")
+
+    try:
+        msg([1, -1, -2])
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.messages == ["This message", "This message"]
+        assert e.paths == [[1], [2]]
+
 ## Default
 
 def test_default():
@@ -120,6 +370,11 @@ def test_default():
     assert default(False) == False
     assert default(124) == 124
 
+def test_default_copied():
+    default = Default([])
+    default(None).append(1)
+    assert default(None) == []
+
 ## Eq
 
 def test_eq_valid():
@@ -236,6 +491,84 @@ def test_coerce_invalid_custom_message():
     except Error as e:
         assert e.message == "Custom message"
 
+## In
+
+@pytest.mark.parametrize('values', [
+    [1, 2, "three"],
+    [[1], [2], [3]],
+    [[1], "two", { 'three': 3 }],
+])
+def test_in(values):
+    _in = In(values)
+    for value in values:
+        assert _in(value) == value
+
+@pytest.mark.parametrize('values, input', [
+    ([1, 2, "three"], 3),
+    ([1, 2, "three"], [1]),
+    ([[1], [2], [3]], [4]),
+    ([[1], [2], [3]], 1),
+    ([[1], "two", { 'three': 3 }], { 'four': 4 }),
+])
+def test_in_invalid(values, input):
+    _in = In(values)
+    try:
+        _in(input)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Not an allowed value"
+
+def test_in_invalid_custom_message():
+    _in = In(range(100000), message="Custom message")
+    try:
+        _in(-1)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Custom message"
+
+def test_in_sorted_file(tmpdir):
+    path = tmpdir.join('values')
+    path.write_binary(b'\n'.join(sorted([b'FI', b'SE', b'NO', b'DK', b'IS'])) + b'\n')
+    values = SortedFile(str(path))
+    _in = In(values)
+
+    for value in ['FI', 'SE', 'NO', 'DK', 'IS', b'FI']:
+        assert _in(value) == value
+    for value in ['', 'F', 'FIN', 'AA', 'ZZ', 123, None]:
+        with pytest.raises(Error):
+            _in(value)
+    values.close()
+
+def test_in_sorted_file_empty(tmpdir):
+    path = tmpdir.join('values')
+    path.write_binary(b'')
+    with pytest.raises(Error):
+        In(SortedFile(str(path)))('FI')
+
+def test_sorted_file_many_values(tmpdir):
+    values = sorted(str(i).encode('ascii') for i in range(0, 2000, 2))
+    path = tmpdir.join('values')
+    path.write_binary(b'\n'.join(values))
+    sorted_file = SortedFile(str(path))
+
+    for i in range(2000):
+        assert (str(i) in sorted_file) == (i % 2 == 0)
+
+## NotIn
+
+def test_not_in():
+    not_in = NotIn(["a", "b"])
+    assert not_in("c") == "c"
+    assert not_in([]) == []
+
+def test_not_in_invalid():
+    not_in = NotIn(["a", "b"], message="Custom message")
+    try:
+        not_in("a")
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Custom message"
+
 ## List
 
 def test_list_mutates():
@@ -295,6 +628,155 @@ def test_list_not_iterable():
     except Error as e:
         assert e.message == "Must be a list"
 
+def test_list_tuple():
+    list = List(lambda x: x + 1)
+    assert list((1, 2, 3)) == (2, 3, 4)
+
+def test_list_generator():
+    list = List(lambda x: x + 1)
+    assert list(x for x in [1, 2, 3]) == [2, 3, 4]
+
+def test_list_tuple_subclass():
+    import collections
+    Point = collections.namedtuple('Point', 'x y')
+    result = List(lambda x: x + 1)(Point(1, 2))
+    assert type(result) is Point
+    assert result == Point(2, 3)
+
+    class Pair(tuple):
+        pass
+    result = List(lambda x: x + 1)(Pair((1, 2)))
+    assert type(result) is Pair
+    assert result == (2, 3)
+
+@pytest.mark.parametrize('value', [u"ab", b"ab"])
+def test_list_strings(value):
+    # Strings can't be updated in place like other sequences.
+    with pytest.raises((TypeError, Error)):
+        List(Type(int))(value)
+    with pytest.raises(TypeError):
+        List(lambda x: x)(value)
+
+def test_list_tuple_fails():
+    def fail(x):
+        if x == 2:
+            raise Error("No")
+        return x
+    list = List(fail)
+
+    try:
+        list((1, 2, 3, 2))
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [[1], [3]]
+
+## List: lazy
+
+def test_list_lazy():
+    consumed = []
+    def items():
+        for i in [1, 2, 3]:
+            consumed.append(i)
+            yield i
+    result = List(lambda x: x + 1, lazy=True)(items())
+
+    assert consumed == []
+    assert next(result) == 2
+    assert consumed == [1]
+    assert [x for x in result] == [3, 4]
+
+def test_list_lazy_fails_when_exhausted():
+    def fail(x):
+        if x % 2 == 0:
+            raise Error("No", ['inner'])
+        return x
+    result = List(fail, lazy=True)(iter([1, 2, 3, 4, 5]))
+
+    valid = []
+    try:
+        for item in result:
+            valid.append(item)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert valid == [1, 3, 5]
+        assert e.paths == [[1, 'inner'], [3, 'inner']]
+
+def test_list_lazy_nested():
+    def fail(x):
+        if x == 0:
+            raise Error("No")
+        return x
+    inner = List(fail, lazy=True)
+    result = List(lambda x: list(inner(x)), lazy=True)(iter([[1], [1, 0]]))
+
+    assert next(result) == [1]
+    try:
+        next(result)
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [[1, 1]]
+
+def test_list_lazy_not_iterable():
+    try:
+        List(lambda x: x, lazy=True)(object())
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must be a list"
+
+## List: numeric buffers
+
+def _buffers(typecode, items):
+    import array
+    yield array.array(typecode, items)
+    yield memoryview(array.array(typecode, items))
+    numpy = pytest.importorskip('numpy')
+    yield numpy.array(items, dtype={ 'd': 'float64', 'l': 'int64' }[typecode])
+
+def _failed_indices(validator, value):
+    try:
+        List(validator)(value)
+    except Invalid as e:
+        return [path[0] for path in e.paths]
+    return []
+
+def test_list_buffer_range():
+    for value in _buffers('d', [0.0, 5.5, 1000.0, float('nan')]):
+        assert List(Range(0, 1000))(value) is value
+    for value in _buffers('d', [float('nan'), -1.0, 5.0, 1001.0, 2.0]):
+        assert _failed_indices(Range(0, 1000), value) == [1, 3]
+    for value in _buffers('l', [1, -5, 3]):
+        assert _failed_indices(Range(min=0), value) == [1]
+        assert _failed_indices(Range(max=0), value) == [0, 2]
+        assert _failed_indices(Range(), value) == []
+
+def test_list_buffer_range_error_message():
+    for value in _buffers('l', [1, 2, 300]):
+        try:
+            List(Range(max=100))(value)
+            raise AssertionError("Expected error.")
+        except Invalid as e:
+            assert e.paths == [[2]]
+            assert e.messages == ["Must be at most 100"]
+
+def test_list_buffer_type():
+    import array
+    value = array.array('l', [1, 2, 3])
+    assert List(Type(int))(value) is value
+    assert List(Instance(numbers.Number))(value) is value
+    assert _failed_indices(Type(float), value) == [0, 1, 2]
+    assert _failed_indices(Instance(float), value) == [0, 1, 2]
+
+def test_list_buffer_eq():
+    for value in _buffers('l', [3, 3, 3]):
+        assert List(Eq(3))(value) is value
+    for value in _buffers('l', [3, 4, 3, 5]):
+        assert _failed_indices(Eq(3), value) == [1, 3]
+
+def test_list_buffer_other_validator():
+    import array
+    value = array.array('l', [1, 2, 3])
+    assert List(lambda x: x * 2)(value) == array.array('l', [2, 4, 6])
+
 ## Boolean
 
 @pytest.mark.parametrize('input, output', [
@@ -453,11 +935,31 @@ def test_lower_invalid():
     except Error as e:
         assert e.message == "Must be a string"
 
+@pytest.mark.parametrize('input, expected', [
+    (b"HELLO", b"hello"),
+    (bytearray(b"HELLO"), bytearray(b"hello")),
+    (memoryview(b"HELLO"), b"hello"),
+    ("HELLO", "hello"),
+])
+def test_lower_binary(input, expected):
+    assert Lower(binary=True)(input) == expected
+
+def test_lower_binary_not_allowed():
+    try:
+        Lower()(b"HELLO")
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must be a string"
+
 ## Upper
 
 def test_upper():
     assert Upper()("hello world") == "HELLO WORLD"
 
+def test_upper_binary():
+    assert Upper(binary=True)(b"hello") == b"HELLO"
+    assert Upper(binary=True)(memoryview(b"hello")) == b"HELLO"
+
 def test_upper_invalid():
     try:
         Upper()(None)
@@ -470,6 +972,21 @@ def test_upper_invalid():
 def test_strip():
     assert Strip()("  hello world  ") == "hello world"
 
+def test_strip_binary():
+    strip = Strip(binary=True)
+    assert strip(b" \thello\r\n") == b"hello"
+    assert strip(bytearray(b" hello ")) == bytearray(b"hello")
+
+def test_strip_memoryview():
+    data = bytearray(b"  hello world\n")
+    result = Strip(binary=True)(memoryview(data))
+
+    assert isinstance(result, memoryview)
+    assert result.tobytes() == b"hello world"
+    data[2:7] = b"HELLO"
+    assert result.tobytes() == b"HELLO world"
+    assert Strip(binary=True)(memoryview(b"   ")).tobytes() == b""
+
 def test_strip_invalid():
     try:
         Strip()(None)
@@ -483,6 +1000,19 @@ def test_not_empty():
     assert NotEmpty()("Hello") == "Hello"
     assert NotEmpty()(" ") == " "
 
+@pytest.mark.parametrize('input', [b"a", bytearray(b"a"), memoryview(b"a")])
+def test_not_empty_binary(input):
+    assert NotEmpty(binary=True)(input) is input
+
+@pytest.mark.parametrize('input', [b"", bytearray(), memoryview(b"")])
+def test_not_empty_binary_invalid(input):
+    for validator in (NotEmpty(), NotEmpty(binary=True)):
+        try:
+            validator(input)
+            raise AssertionError("Expected error.")
+        except Error as e:
+            assert e.message == "Must not be empty"
+
 @pytest.mark.parametrize('input', ["", None])
 def test_not_empty_invalid(input):
     try:
@@ -491,6 +1021,130 @@ def test_not_empty_invalid(input):
     except Error as e:
         assert e.message == "Must not be empty"
 
+## Match
+
+def test_match():
+    match = Match(r'[a-z]+\d')
+    assert match("abc1") == "abc1"
+    assert match("abc1 and more") == "abc1 and more"
+
+def test_match_bytes():
+    match = Match(r'[a-z]+\d')
+    assert match(b"abc1") == b"abc1"
+    assert Match(b'[a-z]+')("abc") == "abc"
+
+def test_match_flags():
+    match = Match(r'[a-z]+', flags=re.IGNORECASE)
+    assert match("ABC") == "ABC"
+    assert match(b"ABC") == b"ABC"
+
+@pytest.mark.parametrize('input', ["1abc", b"ABC", ""])
+def test_match_invalid(input):
+    match = Match(r'[a-z]+')
+    try:
+        match(input)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Does not match the required format"
+
+def test_match_invalid_custom_message():
+    match = Match(r'[a-z]+', message="Custom message")
+    try:
+        match("123")
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Custom message"
+
+@pytest.mark.parametrize('input', [None, 123, object()])
+def test_match_not_string(input):
+    match = Match(r'[a-z]+')
+    try:
+        match(input)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must be a string"
+
+def test_match_invalid_pattern():
+    with pytest.raises(re.error):
+        Match(r'[a-z')
+
+@pytest.mark.parametrize('pattern', [r'\u00e9', r'\N{LATIN SMALL LETTER E WITH ACUTE}'])
+def test_match_text_escapes_bytes(pattern):
+    from decent.schema import Schema
+    match = Match(pattern)
+    assert match(u"\u00e9") == u"\u00e9"
+    for i in range(2):
+        try:
+            match(b"a")
+            raise AssertionError("Expected error.")
+        except Error as e:
+            assert e.message == "Does not match the required format"
+
+    try:
+        Schema({ 'name': match })({ 'name': b"a" })
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [['name']]
+
+def test_match_pattern_cache():
+    from decent.validators import _compile
+    assert _compile(r'cached\d+', 0, False) is _compile(r'cached\d+', 0, False)
+    assert _compile(r'cached\d+', 0, False) is not _compile(r'cached\d+', 0, True)
+
+def test_match_list_paths():
+    list = List(Match(r'\d+$'))
+    try:
+        list(["1", "a", "2", "b"])
+        raise AssertionError("Expected error.")
+    except Invalid as e:
+        assert e.paths == [[1], [3]]
+
+## MatchAny
+
+@pytest.mark.parametrize('patterns', [
+    [r'[a-z]+$', r'\d+$'],
+    [r'([a-z])\1$', r'\d+$'],
+    [b'[a-z]+$', r'\d+$'],
+])
+def test_match_any(patterns):
+    match = MatchAny(patterns)
+    assert match("aa") == "aa"
+    assert match("123") == "123"
+    assert match(b"123") == b"123"
+
+    for input in ["a1", b"-", ""]:
+        try:
+            match(input)
+            raise AssertionError("Expected error.")
+        except Error as e:
+            assert e.message == "Does not match the required format"
+
+def test_match_any_separate_groups():
+    match = MatchAny([r'([a-z])\1$', r'(\d)\1$'])
+    assert match("aa") == "aa"
+    assert match("11") == "11"
+    with pytest.raises(Error):
+        match("ab")
+
+def test_match_any_empty():
+    with pytest.raises(Error):
+        MatchAny([])("abc")
+
+@pytest.mark.parametrize('pattern', [r'\u00e9', r'\N{LATIN SMALL LETTER E WITH ACUTE}'])
+def test_match_any_text_escapes_bytes(pattern):
+    match = MatchAny([pattern, r'a$'])
+    assert match(b"a") == b"a"
+    assert match(u"\u00e9") == u"\u00e9"
+    with pytest.raises(Error):
+        match(b"b")
+
+def test_match_any_not_string():
+    try:
+        MatchAny([r'a'])(None)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must be a string"
+
 ## UUID
 
 def test_uuid():
@@ -515,6 +1169,23 @@ def test_uuid_already_uuid():
 
     assert validator(input) is input
 
+@pytest.mark.parametrize('input', [
+    b"ecc9194a-26e2-11e5-b012-cba0faa68d69",
+    bytearray(b"ecc9194a-26e2-11e5-b012-cba0faa68d69"),
+    memoryview(b"ecc9194a-26e2-11e5-b012-cba0faa68d69"),
+])
+def test_uuid_binary(input):
+    assert str(Uuid(binary=True)(input)) == "ecc9194a-26e2-11e5-b012-cba0faa68d69"
+    assert Uuid(to_uuid=False, binary=True)(input) is input
+
+@pytest.mark.parametrize('input', [b"asd", b"\xff" * 36, memoryview(b"")])
+def test_uuid_binary_invalid(input):
+    try:
+        Uuid(binary=True)(input)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Not a valid UUID"
+
 @pytest.mark.parametrize('input', [None, 123, 'asd'])
 def test_uuid_invalid(input):
     validator = Uuid()
@@ -523,3 +1194,36 @@ def test_uuid_invalid(input):
         raise AssertionError("Expected error.")
     except Error as e:
         assert e.message == "Not a valid UUID"
+
+## Decode
+
+@pytest.mark.parametrize('input', [b"caf\xc3\xa9", bytearray(b"caf\xc3\xa9"), memoryview(b"caf\xc3\xa9"), u"caf\xe9"])
+def test_decode(input):
+    assert Decode()(input) == u"caf\xe9"
+
+def test_decode_encoding():
+    assert Decode('latin-1')(b"caf\xe9") == u"caf\xe9"
+
+def test_decode_invalid():
+    try:
+        Decode()(b"\xff")
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Not valid utf-8 text"
+
+def test_decode_not_string():
+    try:
+        Decode()(123)
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must be a string"
+
+def test_binary_chain():
+    validator = All(Strip(binary=True), Lower(binary=True), NotEmpty(binary=True), Length(max=5), Decode())
+    assert validator(b"  HeLLo ") == u"hello"
+    assert validator(memoryview(b" ABC ")) == u"abc"
+    try:
+        validator(b"   ")
+        raise AssertionError("Expected error.")
+    except Error as e:
+        assert e.message == "Must not be empty"
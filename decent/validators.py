@@ -1,34 +1,229 @@
+from bisect import bisect_left
 from functools import wraps
+from operator import methodcaller
+import array
+import copy
+import inspect
+import mmap
 import numbers
+import os
+import re
 import uuid
+import weakref
 
 import six
 
 from decent.error import Error, Invalid
 
+_getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+
+def _builtin(factory):
+    """
+    Marks a built-in validator factory. Validators built by it get a
+    ``factory`` attribute and an ``args`` dictionary of the arguments they
+    were built with, so that other validators can recognize them.
+
+    Validators are interned: building one with the same arguments as an
+    existing one returns the existing instance, so equal validators compare
+    equal and hash alike. Validators built with unhashable arguments are not
+    interned, and large tuples and frozensets are only recognized as the
+    same object.
+    """
+    # Inspect the signature once: binding the arguments with inspect on every
+    # call would cost more than building the validator itself.
+    spec = _getargspec(factory)
+    names = spec.args
+    varargs = spec.varargs
+    defaults = dict(zip(reversed(names), reversed(spec.defaults or ())))
+
+    @wraps(factory)
+    def create(*args, **kwargs):
+        bound = dict(defaults)
+        bound.update(zip(names, args))
+        bound.update(kwargs)
+        if varargs:
+            bound[varargs] = args[len(names):]
+
+        try:
+            key = (create, frozenset((name, _intern_key(value)) for name, value in six.iteritems(bound)))
+            built = _interned.get(key)
+        except TypeError:
+            key = built = None
+
+        if built is None:
+            built = factory(*args, **kwargs)
+            built.factory = create
+            built.args = bound
+            if key is not None:
+                _interned[key] = built
+        return built
+    return create
+
+_interned = weakref.WeakValueDictionary()
+
+# Collections with more items are keyed on their identity.
+_INTERN_ITEMS = 64
+
+class _Identity(object):
+    """
+    An intern key for a large collection that compares by identity, so the
+    key is not a copy of the collection and is cheap to build. Holds the
+    collection so its id can't be reused while the key exists.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and other.value is self.value
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self.value)
+
+def _intern_key(value):
+    """
+    Returns a key for the given argument value that tells apart values that
+    are equal but format differently, like ``1`` and ``True`` or ``0.0`` and
+    ``-0.0``.
+    """
+    kind = type(value)
+    if kind is tuple or kind is frozenset:
+        if len(value) > _INTERN_ITEMS:
+            return _Identity(value)
+        if kind is tuple:
+            return kind, tuple(_intern_key(v) for v in value)
+        return kind, frozenset(_intern_key(v) for v in value)
+    if isinstance(value, numbers.Number) and not isinstance(value, numbers.Integral):
+        return kind, value, repr(value)
+    return kind, value
+
+def _factory(validator):
+    return getattr(validator, 'factory', None)
+
 ## Helpers
 
+@_builtin
 def All(*validators):
     """
     Combines all the given validator callables into one, running all the
     validators in sequence on the given value.
+
+    Adjacent built-in string validators (:func:`Strip`, :func:`Lower`,
+    :func:`Upper`, :func:`NotEmpty` and :func:`Length`) are fused into a
+    single step that checks the type of the value only once.
     """
+    steps = _fuse(validators)
+
     @wraps(All)
     def built(value):
-        for validator in validators:
+        for validator in steps:
             value = validator(value)
         return value
     return built
 
+def _fuse(validators):
+    """
+    Flattens nested :func:`All` validators and fuses runs of adjacent string
+    validators. Other callables are kept as they are.
+    """
+    flat = []
+    for validator in validators:
+        if _factory(validator) is All:
+            flat.extend(validator.args['validators'])
+        else:
+            flat.append(validator)
+
+    steps = []
+    run = []
+    for validator in flat + [None]:
+        if validator is not None and _factory(validator) in _STRING_STEPS:
+            run.append(validator)
+            continue
+        if len(run) > 1:
+            steps.append(_fuse_strings(run))
+        else:
+            steps.extend(run)
+        run = []
+        if validator is not None:
+            steps.append(validator)
+    return steps
+
+def _fuse_strings(validators):
+    """
+    Builds a single validator from a run of string validators. String values
+    go through unchecked string operations; anything else goes through the
+    original validators, so the raised errors are the same.
+    """
+    operations = [_STRING_STEPS[_factory(v)](**v.args) for v in validators]
+
+    # Bytes take the same path if every validator accepts them.
+    types = six.string_types
+    if all(_factory(v) is Length or v.args['binary'] for v in validators):
+        types += (six.binary_type, bytearray)
+
+    def fused(value):
+        if not isinstance(value, types):
+            for validator in validators:
+                value = validator(value)
+            return value
+        for operation in operations:
+            value = operation(value)
+        return value
+    return fused
+
+def _accepts(validator, kind):
+    """
+    Checks if the given validator can accept values of type ``kind``, using
+    the ``accepts`` type predicate declared by built-in validators. Opaque
+    callables are assumed to accept anything.
+    """
+    accepts = getattr(validator, 'accepts', None)
+    if accepts is None:
+        return True
+    try:
+        return accepts(kind)
+    except Exception:
+        return True
+
+@_builtin
 def Any(*validators):
     """
     Combines all the given validator callables into one, running the given
     value through them in sequence until a valid result is given.
+
+    Built-in validators declare the input types they accept. Alternatives that
+    would reject the type of the given value outright are skipped. If every
+    alternative fails, the error of the last alternative is raised.
     """
+    dispatch = {}
+
+    def candidates(kind):
+        try:
+            return dispatch[kind]
+        except KeyError:
+            pass
+        result = [v for v in validators if _accepts(v, kind)]
+        # The last alternative always runs to raise the same error as a full
+        # scan would.
+        if validators and not _accepts(validators[-1], kind):
+            result.append(validators[-1])
+        dispatch[kind] = result
+        return result
+
     @wraps(Any)
     def built(value):
+        kind = type(value)
+        if getattr(value, '__class__', kind) is kind:
+            alternatives = candidates(kind)
+        else:
+            alternatives = validators
         error = None
-        for validator in validators:
+        for validator in alternatives:
             try:
                 return validator(value)
             except Error as e:
@@ -36,6 +231,49 @@ def Any(*validators):
         raise error
     return built
 
+@_builtin
+def Tagged(key, validators, default=None, message="Unknown value {!r}", required_message="This field is required."):
+    """
+    Creates a validator for discriminated unions: the value of the ``key``
+    field in the given dictionary selects the validator to run from the
+    ``validators`` dictionary. Only the selected validator runs, and its
+    errors are raised as is.
+
+    If the key is missing or its value is unknown, ``default`` is used
+    instead. Without a default, an error is raised with the key as the path.
+
+    A custom message for unknown values can be specified with ``message``. It
+    will be formatted with the value. The ``required_message`` is used when
+    the key is missing.
+    """
+    validators = dict(validators)
+
+    def select(value):
+        if not isinstance(value, dict):
+            raise Error("Must be a dictionary")
+
+        try:
+            tag = value[key]
+        except KeyError:
+            if default is not None:
+                return default
+            raise Error(required_message, [key])
+
+        try:
+            return validators[tag]
+        except (KeyError, TypeError):
+            if default is not None:
+                return default
+            raise Error(message, [key], (tag,))
+
+    @wraps(Tagged)
+    def built(value):
+        return select(value)(value)
+    built.accepts = lambda kind: issubclass(kind, dict)
+    built.select = select
+    return built
+
+@_builtin
 def Maybe(validator):
     """
     Wraps the given validator callable, only using it for the given value if it
@@ -47,6 +285,7 @@ def Maybe(validator):
             return validator(value)
     return built
 
+@_builtin
 def Msg(validator, message):
     """
     Wraps the given validator callable, replacing any error messages raised.
@@ -55,25 +294,28 @@ def Msg(validator, message):
     def built(value):
         try:
             return validator(value)
+        except Invalid as e:
+            raise Invalid([Error(message, error.path) for error in e])
         except Error as e:
-            e.message = message
-            raise e
+            raise Error(message, e.path)
     return built
 
+@_builtin
 def Default(default):
     """
     Creates a validator callable that replaces ``None`` with the specified
-    default value.
+    default value. The default is copied for every value.
     """
     @wraps(Default)
     def built(value):
         if value == None:
-            return default
+            return copy.deepcopy(default)
         return value
     return built
 
 ## Basics
 
+@_builtin
 def Eq(value, message="Not equal to {!s}"):
     """
     Creates a validator that compares the equality of the given value to
@@ -85,10 +327,11 @@ def Eq(value, message="Not equal to {!s}"):
     @wraps(Eq)
     def built(_value):
         if _value != value:
-            raise Error(message.format(value))
+            raise Error(message, params=(value,))
         return _value
     return built
 
+@_builtin
 def Type(expected, message="Not of type {}"):
     """
     Creates a validator that compares the type of the given value to
@@ -100,10 +343,12 @@ def Type(expected, message="Not of type {}"):
     @wraps(Type)
     def built(value):
         if type(value) != expected:
-            raise Error(message.format(expected.__name__))
+            raise Error(message, params=(expected.__name__,))
         return value
+    built.accepts = lambda kind: kind == expected
     return built
 
+@_builtin
 def Instance(expected, message="Not an instance of {}"):
     """
     Creates a validator that checks if the given value is an instance of
@@ -114,10 +359,12 @@ def Instance(expected, message="Not an instance of {}"):
     @wraps(Instance)
     def built(value):
         if not isinstance(value, expected):
-            raise Error(message.format(expected.__name__))
+            raise Error(message, params=(expected.__name__,))
         return value
+    built.accepts = lambda kind: issubclass(kind, expected)
     return built
 
+@_builtin
 def Coerce(type, message="Not a valid {} value"):
     """
     Creates a validator that attempts to coerce the given value to the
@@ -130,44 +377,307 @@ def Coerce(type, message="Not a valid {} value"):
         try:
             return type(value)
         except (TypeError, ValueError) as e:
-            raise Error(message.format(type.__name__))
+            raise Error(message, params=(type.__name__,))
+    return built
+
+## Membership
+
+class SortedFile(object):
+    """
+    A read-only set of values stored in a file, one value per line, sorted
+    bytewise (for example with ``LC_ALL=C sort``). The file is memory-mapped
+    and searched with a binary search, so huge sets can be shared between
+    processes without loading them into memory. Can be given to :func:`In`
+    and :func:`NotIn`.
+
+    Text values are encoded with ``encoding`` before searching.
+    """
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b''
+
+    def __contains__(self, value):
+        if isinstance(value, six.text_type):
+            value = value.encode(self.encoding)
+        elif not isinstance(value, six.binary_type):
+            return False
+
+        data = self._map
+        low, high = 0, len(data)
+        while low < high:
+            middle = (low + high) // 2
+            start = max(low, data.rfind(b'\n', low, middle) + 1)
+            end = data.find(b'\n', middle, high)
+            if end == -1:
+                end = high
+            line = data[start:end]
+            if line < value:
+                low = end + 1
+            elif line > value:
+                high = start
+            else:
+                return True
+        return False
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+def _membership(values):
+    """
+    Returns a membership test function for the given values, using the
+    cheapest index the values allow: a ``frozenset`` for hashable values, a
+    sorted list for orderable values, or a plain list otherwise.
+    """
+    if isinstance(values, SortedFile):
+        return values.__contains__
+
+    values = list(values)
+    try:
+        index = frozenset(values)
+    except TypeError:
+        pass
+    else:
+        def contains(value):
+            try:
+                return value in index
+            except TypeError:
+                return False
+        return contains
+
+    try:
+        ordered = sorted(values)
+    except TypeError:
+        pass
+    else:
+        def contains(value):
+            try:
+                i = bisect_left(ordered, value)
+                return i < len(ordered) and ordered[i] == value
+            except TypeError:
+                return False
+        return contains
+
+    return values.__contains__
+
+@_builtin
+def In(values, message="Not an allowed value"):
+    """
+    Creates a validator that checks if the given value is one of ``values``.
+    The values can be any iterable or a :class:`SortedFile`. They are indexed
+    once, so checks stay fast for very large sets.
+
+    A custom message can be specified with ``message``. The allowed values are
+    not included in the message.
+    """
+    contains = _membership(values)
+
+    @wraps(In)
+    def built(value):
+        if not contains(value):
+            raise Error(message)
+        return value
+    return built
+
+@_builtin
+def NotIn(values, message="Not an allowed value"):
+    """
+    Creates a validator that checks if the given value is not one of
+    ``values``. See :func:`In`.
+    """
+    contains = _membership(values)
+
+    @wraps(NotIn)
+    def built(value):
+        if contains(value):
+            raise Error(message)
+        return value
     return built
 
 ## Collections
 
-def List(validator):
+@_builtin
+def List(validator, lazy=False):
     """
     Creates a validator that runs the given validator on every item in a list
     or other collection. The validator can mutate the values.
 
+    Mutable sequences are updated in place. Tuples give a new tuple of the
+    same type, and other iterables like generators give a new list. Strings
+    and bytes are not treated as collections of items.
+
     Any raised errors will be collected into a single ``Invalid`` error. Their
     paths will be replaced with the index of the item. Will raise an error if
     the input value is not iterable.
+
+    If ``lazy`` is ``True``, a generator of result values is returned instead.
+    Any iterable is accepted and nothing is materialized, so arbitrarily long
+    streams can be validated in constant memory. Items that fail are skipped,
+    and the collected errors are raised once the input is exhausted. Lazy
+    lists can't be used in a :class:`decent.schema.Schema`, since its results
+    are complete values.
+
+    One-dimensional numeric buffers (``array.array``, ``memoryview`` and numpy
+    arrays) are checked in bulk when the validator is a built-in
+    :func:`Range`, :func:`Type`, :func:`Instance` or :func:`Eq`. The
+    validator then only runs for the failing items.
     """
+    bulk = _BULK_CHECKS.get(_factory(validator))
+
     @wraps(List)
     def built(value):
         if not hasattr(value, '__iter__'):
             raise Error("Must be a list")
 
+        if lazy:
+            return _each(validator, value)
+
+        if not hasattr(value, '__setitem__') and not isinstance(value, _TEXT_TYPES):
+            result = list(_each(validator, value))
+            if isinstance(value, tuple):
+                return _tuple(value, result)
+            return result
+
         invalid = Invalid()
-        for i, item in enumerate(value):
+
+        failures = None
+        if bulk is not None:
+            buffer = _numeric_buffer(value)
+            if buffer is not None:
+                failures = bulk(buffer, value, **validator.args)
+
+        if failures is not None:
+            items = ((i, value[i]) for i in failures)
+        else:
+            items = enumerate(value)
+
+        for i, item in items:
             try:
                 value[i] = validator(item)
             except Invalid as e:
                 for error in e:
-                    error.path.insert(0, i)
-                    invalid.append(error)
+                    invalid.append(error.prefixed([i]))
             except Error as e:
-                e.path.insert(0, i)
-                invalid.append(e)
+                invalid.append(e.prefixed([i]))
 
         if len(invalid):
             raise invalid
         return value
+    built.accepts = lambda kind: hasattr(kind, '__iter__')
     return built
 
+_TEXT_TYPES = six.string_types + (six.binary_type,)
+
+def _tuple(value, items):
+    """
+    Returns the given items as a tuple of the same type as ``value``.
+    """
+    kind = type(value)
+    if kind is tuple:
+        return tuple(items)
+    if hasattr(kind, '_make'):
+        return kind._make(items)
+    return kind(items)
+
+def _each(validator, value):
+    """
+    Yields the validated items of the given iterable, raising the collected
+    errors once it is exhausted.
+    """
+    invalid = Invalid()
+    for i, item in enumerate(value):
+        try:
+            result = validator(item)
+        except Invalid as e:
+            for error in e:
+                invalid.append(error.prefixed([i]))
+            continue
+        except Error as e:
+            invalid.append(e.prefixed([i]))
+            continue
+        yield result
+
+    if len(invalid):
+        raise invalid
+
+_INT_CODES = frozenset('bBhHiIlLqQnN')
+_FLOAT_CODES = frozenset('fd')
+
+def _numeric_buffer(value):
+    """
+    Returns ``(item_type, numpy)`` for one-dimensional numeric buffers, where
+    ``item_type`` is the type of every item in the buffer. Returns ``None``
+    for anything else.
+    """
+    if isinstance(value, (array.array, memoryview)):
+        code = value.typecode if isinstance(value, array.array) else value.format
+        if isinstance(value, memoryview) and value.ndim != 1:
+            return None
+        if code in _INT_CODES:
+            return int, False
+        if code in _FLOAT_CODES:
+            return float, False
+        return None
+    if type(value).__module__ == 'numpy':
+        dtype = getattr(value, 'dtype', None)
+        if getattr(value, 'ndim', None) == 1 and getattr(dtype, 'kind', None) in ('i', 'u', 'f'):
+            return dtype.type, True
+    return None
+
+def _bulk_range(buffer, items, **args):
+    low, high = args['min'], args['max']
+    item_type, numpy = buffer
+    if numpy:
+        mask = None
+        if low is not None:
+            mask = items < low
+        if high is not None:
+            mask = items > high if mask is None else mask | (items > high)
+        if mask is None:
+            return []
+        return mask.nonzero()[0].tolist()
+
+    if not len(items):
+        return []
+    # The builtin min() and max() skip NaN items like Range does, unless the
+    # first item is NaN.
+    first = items[0]
+    if first == first:
+        if (low is None or min(items) >= low) and (high is None or max(items) <= high):
+            return []
+    return [i for i, item in enumerate(items)
+            if (low is not None and low > item) or (high is not None and item > high)]
+
+def _bulk_type(buffer, items, expected, **args):
+    if buffer[0] == expected:
+        return []
+    return list(six.moves.range(len(items)))
+
+def _bulk_instance(buffer, items, expected, **args):
+    if issubclass(buffer[0], expected):
+        return []
+    return list(six.moves.range(len(items)))
+
+def _bulk_eq(buffer, items, **args):
+    expected = args['value']
+    item_type, numpy = buffer
+    if numpy:
+        if not isinstance(expected, numbers.Number):
+            return None
+        return (items != expected).nonzero()[0].tolist()
+    if isinstance(items, array.array) and items.count(expected) == len(items):
+        return []
+    return [i for i, item in enumerate(items) if item != expected]
+
 ## Booleans
 
+@_builtin
 def Boolean():
     """
     Creates a validator that attempts to convert the given value to a boolean
@@ -205,10 +715,15 @@ def Boolean():
 
         # Nope
         raise Error("Not a boolean value.")
+    built.accepts = lambda kind: issubclass(kind, (bool, int, str, type(None)))
     return built
 
 ## Numbers
 
+def _accepts_number(kind):
+    return issubclass(kind, numbers.Number) and not issubclass(kind, bool)
+
+@_builtin
 def Range(min=None, max=None, min_message="Must be at least {min}", max_message="Must be at most {max}"):
     """
     Creates a validator that checks if the given numeric value is in the
@@ -219,17 +734,33 @@ def Range(min=None, max=None, min_message="Must be at least {min}", max_message=
     The error messages raised can be customized with ``min_message`` and
     ``max_message``. The ``min`` and ``max`` arguments are formatted.
     """
+    bounds = { 'min': min, 'max': max }
+
     @wraps(Range)
     def built(value):
         if not isinstance(value, numbers.Number) or isinstance(value, bool):
             raise Error("Not a number")
         if min is not None and min > value:
-            raise Error(min_message.format(min=min, max=max))
+            raise Error(min_message, params=bounds)
         if max is not None and value > max:
-            raise Error(max_message.format(min=min, max=max))
+            raise Error(max_message, params=bounds)
         return value
+    built.accepts = _accepts_number
     return built
 
+def _length_step(min=None, max=None, min_message=None, max_message=None):
+    bounds = { 'min': min, 'max': max }
+
+    def step(value):
+        length = len(value)
+        if min is not None and min > length:
+            raise Error(min_message, params=bounds)
+        if max is not None and length > max:
+            raise Error(max_message, params=bounds)
+        return value
+    return step
+
+@_builtin
 def Length(min=None, max=None, min_message="Must have a length of at least {min}", max_message="Must have a length of at most {max}"):
     """
     Creates a validator that checks if the given value's length is in the
@@ -237,89 +768,316 @@ def Length(min=None, max=None, min_message="Must have a length of at least {min}
 
     See :func:`.Range`.
     """
-    validator = Range(min, max, min_message, max_message)
+    check = _length_step(min, max, min_message, max_message)
+
     @wraps(Length)
     def built(value):
         if not hasattr(value, '__len__'):
             raise Error("Does not have a length")
-        validator(len(value))
-        return value
+        return check(value)
+    built.accepts = lambda kind: hasattr(kind, '__len__')
     return built
 
+_BULK_CHECKS = {
+    Range: _bulk_range,
+    Type: _bulk_type,
+    Instance: _bulk_instance,
+    Eq: _bulk_eq,
+}
+
 ## Strings
 
-def _string_function(value, name):
-    if not isinstance(value, six.string_types):
+_BINARY_TYPES = (six.binary_type, bytearray, memoryview)
+_WHITESPACE_BYTES = b' \t\n\r\x0b\x0c'
+
+def _string_types(binary):
+    return six.string_types + _BINARY_TYPES if binary else six.string_types
+
+def _accepts_string(kind):
+    return issubclass(kind, six.string_types)
+
+def _accepts_binary(kind):
+    return issubclass(kind, six.string_types + _BINARY_TYPES)
+
+def _string_function(value, name, binary=False):
+    if isinstance(value, six.string_types):
+        return getattr(value, name)()
+    if not binary or not isinstance(value, _BINARY_TYPES):
         raise Error("Must be a string")
+    if isinstance(value, memoryview):
+        if name == 'strip':
+            return _strip_view(value)
+        value = value.tobytes()
     return getattr(value, name)()
 
-def Lower():
+def _strip_view(value):
+    """
+    Strips ASCII whitespace from both ends of a memoryview by slicing it,
+    without copying the data.
+    """
+    start, end = 0, len(value)
+    while start < end and value[start:start + 1].tobytes() in _WHITESPACE_BYTES:
+        start += 1
+    while end > start and value[end - 1:end].tobytes() in _WHITESPACE_BYTES:
+        end -= 1
+    return value[start:end]
+
+@_builtin
+def Lower(binary=False):
     """
     Creates a validator that converts the input string to lowercase. Will raise
     an error for non-string types.
+
+    If ``binary`` is ``True``, ``bytes``, ``bytearray`` and ``memoryview``
+    values are also accepted and converted as ASCII. Memoryviews give
+    ``bytes``.
     """
     @wraps(Lower)
     def built(value):
-        return _string_function(value, 'lower')
+        return _string_function(value, 'lower', binary)
+    built.accepts = _accepts_binary if binary else _accepts_string
     return built
 
-def Upper():
+@_builtin
+def Upper(binary=False):
     """
     Creates a validator that converts the input string to UPPERCASE. Will raise
     an error for non-string types.
+
+    See :func:`Lower` for ``binary``.
     """
     @wraps(Upper)
     def built(value):
-        return _string_function(value, 'upper')
+        return _string_function(value, 'upper', binary)
+    built.accepts = _accepts_binary if binary else _accepts_string
     return built
 
-def Strip():
+@_builtin
+def Strip(binary=False):
     """
     Creates a validator that strips the input string of whitespace. Will raise
     an error for non-string types.
+
+    If ``binary`` is ``True``, ``bytes``, ``bytearray`` and ``memoryview``
+    values are also accepted and stripped of ASCII whitespace. Memoryviews
+    are sliced without copying.
     """
     @wraps(Strip)
     def built(value):
-        return _string_function(value, 'strip')
+        return _string_function(value, 'strip', binary)
+    built.accepts = _accepts_binary if binary else _accepts_string
     return built
 
-def NotEmpty():
+@_builtin
+def NotEmpty(binary=False):
     """
     Creates a validator that validates the given string is not empty. Will
     raise an error for non-string types.
+
+    If ``binary`` is ``True``, ``bytes``, ``bytearray`` and ``memoryview``
+    values are also accepted.
     """
+    types = _string_types(binary)
+
     @wraps(NotEmpty)
     def built(value):
-        if not isinstance(value, six.string_types) or not value:
+        if not isinstance(value, types) or not len(value):
             raise Error("Must not be empty")
         return value
+    built.accepts = _accepts_binary if binary else _accepts_string
+    return built
+
+def _not_empty_step(message="Must not be empty"):
+    def step(value):
+        if not value:
+            raise Error(message)
+        return value
+    return step
+
+_STRING_STEPS = {
+    Lower: lambda binary=False: methodcaller('lower'),
+    Upper: lambda binary=False: methodcaller('upper'),
+    Strip: lambda binary=False: methodcaller('strip'),
+    NotEmpty: lambda binary=False: _not_empty_step(),
+    Length: _length_step,
+}
+
+## Patterns
+
+_patterns = {}
+_PATTERNS_MAX = 10000
+
+def _compile(pattern, flags, binary):
+    """
+    Compiles the given regular expression for text or ``binary`` input. The
+    compiled patterns are cached separately from the ``re`` module's cache,
+    which is too small for applications with hundreds of patterns.
+    """
+    key = (pattern, flags, binary)
+    try:
+        return _patterns[key]
+    except KeyError:
+        pass
+    if binary and isinstance(pattern, six.text_type):
+        source = pattern.encode('utf-8')
+    elif not binary and isinstance(pattern, six.binary_type):
+        source = pattern.decode('utf-8')
+    else:
+        source = pattern
+    if binary:
+        flags &= ~re.UNICODE
+    compiled = re.compile(source, flags)
+    if len(_patterns) >= _PATTERNS_MAX:
+        _patterns.clear()
+    _patterns[key] = compiled
+    return compiled
+
+def _pattern_matcher(pattern, flags):
+    """
+    Returns a function that finds the compiled pattern for a given value, or
+    raises an error for non-string values. Returns ``None`` if the pattern
+    can't be used for the value's type, like a text pattern with a ``\\u``
+    escape for bytes.
+    """
+    unusable = set()
+    def matcher(value):
+        if isinstance(value, six.text_type):
+            binary = False
+        elif isinstance(value, _BINARY_TYPES):
+            binary = True
+        else:
+            raise Error("Must be a string")
+        if binary in unusable:
+            return None
+        try:
+            return _compile(pattern, flags, binary)
+        except (UnicodeError, re.error):
+            unusable.add(binary)
+            return None
+    return matcher
+
+def _accepts_pattern(kind):
+    return issubclass(kind, (six.text_type,) + _BINARY_TYPES)
+
+@_builtin
+def Match(pattern, flags=0, message="Does not match the required format"):
+    """
+    Creates a validator that checks if the given string matches the regular
+    expression ``pattern`` from the beginning, like ``re.match``. Accepts both
+    text and bytes values. Will raise an error for non-string types.
+
+    A custom message can be specified with ``message``.
+    """
+    _compile(pattern, flags, isinstance(pattern, six.binary_type))
+    matcher = _pattern_matcher(pattern, flags)
+
+    @wraps(Match)
+    def built(value):
+        compiled = matcher(value)
+        if compiled is None or compiled.match(value) is None:
+            raise Error(message)
+        return value
+    built.accepts = _accepts_pattern
+    return built
+
+@_builtin
+def MatchAny(patterns, flags=0, message="Does not match the required format"):
+    """
+    Creates a validator that checks if the given string matches any of the
+    regular expressions in ``patterns``, like :func:`Match`.
+
+    The patterns are combined into a single alternation so the value is only
+    scanned once. Patterns containing groups are matched one by one instead,
+    since combining them would renumber their backreferences.
+    """
+    patterns = list(patterns)
+    combined = '|'.join(
+        '(?P<_{}>{})'.format(i, p.decode('utf-8') if isinstance(p, six.binary_type) else p)
+        for i, p in enumerate(patterns))
+    separate = [_pattern_matcher(p, flags) for p in patterns]
+
+    compiled = [_compile(p, flags, isinstance(p, six.binary_type)) for p in patterns]
+    alternation = None
+    if patterns and not any(c.groups for c in compiled):
+        try:
+            _compile(combined, flags, False)
+            alternation = _pattern_matcher(combined, flags)
+        except (re.error, UnicodeError):
+            pass
+
+    @wraps(MatchAny)
+    def built(value):
+        if alternation is not None:
+            compiled = alternation(value)
+            if compiled is not None:
+                if compiled.match(value) is None:
+                    raise Error(message)
+                return value
+        # The alternation can't be used for this type, so one of the patterns
+        # can't be either. Try the others.
+        for matcher in separate:
+            compiled = matcher(value)
+            if compiled is not None and compiled.match(value) is not None:
+                return value
+        raise Error(message)
+    built.accepts = _accepts_pattern
     return built
 
 ## String conversions
 
-def Uuid(to_uuid=True):
+@_builtin
+def Uuid(to_uuid=True, binary=False):
     """
     Creates a UUID validator. Will raise an error for non-string types and
     non-UUID values.
 
     The given value will be converted to an instance of ``uuid.UUID`` unless
     ``to_uuid`` is ``False``.
+
+    If ``binary`` is ``True``, ASCII ``bytes``, ``bytearray`` and
+    ``memoryview`` values are also accepted.
     """
+    types = _string_types(binary)
+
     @wraps(Uuid)
     def built(value):
-        invalid = Error("Not a valid UUID")
-
         if isinstance(value, uuid.UUID):
             return value
-        elif not isinstance(value, six.string_types):
-            raise invalid
+        elif not isinstance(value, types):
+            raise Error("Not a valid UUID")
 
         try:
-            as_uuid = uuid.UUID(value)
+            text = value if isinstance(value, six.string_types) else six.text_type(value, 'ascii')
+            as_uuid = uuid.UUID(text)
         except (ValueError, AttributeError) as e:
-            raise invalid
+            raise Error("Not a valid UUID")
 
         if to_uuid:
             return as_uuid
         return value
+    built.accepts = lambda kind: issubclass(kind, (uuid.UUID,) + types)
+    return built
+
+@_builtin
+def Decode(encoding='utf-8', message="Not valid {} text"):
+    """
+    Creates a validator that decodes ``bytes``, ``bytearray`` and
+    ``memoryview`` values to text with the given ``encoding``. Text values are
+    returned as they are. Will raise an error for other types.
+
+    Use it as the last step after binary validators, so only the values that
+    are kept get decoded. A custom message can be specified with ``message``.
+    It will be formatted with the encoding.
+    """
+    @wraps(Decode)
+    def built(value):
+        if isinstance(value, six.text_type):
+            return value
+        if not isinstance(value, _BINARY_TYPES):
+            raise Error("Must be a string")
+        try:
+            return six.text_type(value, encoding)
+        except UnicodeError:
+            raise Error(message, params=(encoding,))
+    built.accepts = _accepts_binary
     return built